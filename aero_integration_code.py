@@ -4,7 +4,47 @@
 # Add this code to your tts_app19.py file after app initialization
 # ============================================================================
 
-from flask import render_template
+import queue
+import re
+import sqlite3
+from contextlib import contextmanager
+from flask import render_template, Response
+
+try:
+    import orjson  # Optional: faster JSON encoding for the audio file list
+except ImportError:
+    orjson = None
+
+_MP3_SUFFIX_RE = re.compile(r'\.mp3$')
+
+class AeroConnectionPool:
+    """Pre-opened SQLite connections reused across Aero API requests"""
+
+    def __init__(self, db_path, size=8):
+        self._connections = queue.Queue(maxsize=size)
+        for _ in range(size):
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA cache_size=-65536')
+            conn.execute('PRAGMA mmap_size=268435456')
+            self._connections.put(conn)
+
+    @contextmanager
+    def acquire(self):
+        """Borrow a connection, returning it to the pool afterwards"""
+        conn = self._connections.get()
+        try:
+            yield conn
+        finally:
+            self._connections.put(conn)
+
+aero_db_pool = AeroConnectionPool(db.db_path)
+
+# Serves the per-user, newest-first listing below without a full scan + sort
+with aero_db_pool.acquire() as conn:
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_audio_user_created ON audio_files(user_id, created_at DESC)')
+    conn.commit()
 
 @app.route('/dashboard')
 @login_required
@@ -32,34 +72,52 @@ def api_get_audio_files():
     """API endpoint to get user's audio files for Aero dashboard"""
     user_id = session.get('user_id')
 
-    conn = db.get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT filename, voice, speed, text_preview, group_name,
-               file_path, created_at
-        FROM audio_files
-        WHERE user_id = ?
-        ORDER BY created_at DESC
-        LIMIT 50
-    """, (user_id,))
-
-    files = []
-    for row in cursor.fetchall():
-        files.append({
+    with aero_db_pool.acquire() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT filename, voice, speed, group_name,
+                   file_path, created_at
+            FROM audio_files
+            WHERE user_id = ?
+            ORDER BY created_at DESC
+            LIMIT 50
+        """, (user_id,))
+        rows = cursor.fetchall()
+
+    files = [
+        {
             'filename': row[0],
             'voice': row[1],
             'speed': row[2],
-            'text_preview': row[3],
-            'group': row[4],
-            'file_path': row[5],
-            'created_at': row[6] if row[6] else None,
-            'display_name': row[0].replace('_', ' ').replace('.mp3', '') if row[0] else 'Audio File'
-        })
-
-    conn.close()
+            'group': row[3],
+            'file_path': row[4],
+            'created_at': row[5] if row[5] else None,
+            'display_name': _MP3_SUFFIX_RE.sub('', row[0].replace('_', ' ')) if row[0] else 'Audio File'
+        }
+        for row in rows
+    ]
+
+    if orjson is not None:
+        return Response(orjson.dumps(files), mimetype='application/json')
     return jsonify(files)
 
+@app.route('/api/audio-files/<filename>/preview', methods=['GET'])
+@login_required
+def api_get_audio_file_preview(filename):
+    """Text preview for one audio file, loaded when the item is expanded"""
+    user_id = session.get('user_id')
+
+    with aero_db_pool.acquire() as conn:
+        row = conn.execute(
+            'SELECT text_preview FROM audio_files WHERE user_id = ? AND filename = ?',
+            (user_id, filename)
+        ).fetchone()
+
+    if row is None:
+        return jsonify({'error': 'File not found'}), 404
+    return jsonify({'filename': filename, 'text_preview': row[0]})
+
 # ============================================================================
 # END OF AERO DASHBOARD INTEGRATION
 # ============================================================================
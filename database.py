@@ -705,6 +705,39 @@ class Database:
         except Exception:
             return None
 
+    def log_security_events_batch(self, events: List[Dict]) -> int:
+        """
+        Log several security events in a single transaction.
+
+        Args:
+            events: List of dicts with log_security_event() keyword arguments
+
+        Returns:
+            Number of events written
+        """
+        rows = [
+            (
+                event['event_type'],
+                event.get('user_id'),
+                event.get('username'),
+                event['ip_address'],
+                event.get('details'),
+                event['success']
+            )
+            for event in events
+        ]
+        try:
+            with self._get_cursor() as cursor:
+                cursor.executemany(
+                    """INSERT INTO security_logs
+                       (event_type, user_id, username, ip_address, details, success)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                    rows
+                )
+                return len(rows)
+        except Exception:
+            return 0
+
     def get_security_logs(
         self,
         limit: int = 100,
@@ -4,43 +4,46 @@ Extract embedded HTML templates from tts_app19.py and save them as separate file
 This is a one-time migration script.
 """
 
+import mmap
 import re
 import os
 
+# Template variable name -> output file
+TEMPLATE_TARGETS = {
+    'SETTINGS_TEMPLATE': 'templates/settings_new.html',
+    'HTML_TEMPLATE': 'templates/index_new.html',
+    'AUTH_TEMPLATE': 'templates/auth_new.html',
+}
+
+# One pattern for all three templates so the source is scanned only once.
+# Bytes pattern so it can run directly over an mmap of the source file.
+TEMPLATE_PATTERN = re.compile(
+    rb'^(SETTINGS_TEMPLATE|HTML_TEMPLATE|AUTH_TEMPLATE)\s*=\s*"""(.*?)"""',
+    re.DOTALL | re.MULTILINE
+)
+
 def extract_templates():
-    with open('tts_app19.py', 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # Extract SETTINGS_TEMPLATE
-    settings_match = re.search(r'SETTINGS_TEMPLATE\s*=\s*"""(.*?)"""', content, re.DOTALL)
-    if settings_match:
-        settings_html = settings_match.group(1).strip()
-        os.makedirs('templates', exist_ok=True)
-        with open('templates/settings_new.html', 'w', encoding='utf-8') as f:
-            f.write(settings_html)
-        print(f"✅ Extracted SETTINGS_TEMPLATE ({len(settings_html)} chars) -> templates/settings_new.html")
-    else:
-        print("❌ Could not find SETTINGS_TEMPLATE")
-
-    # Extract HTML_TEMPLATE
-    html_match = re.search(r'HTML_TEMPLATE\s*=\s*"""(.*?)"""', content, re.DOTALL)
-    if html_match:
-        html_content = html_match.group(1).strip()
-        with open('templates/index_new.html', 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        print(f"✅ Extracted HTML_TEMPLATE ({len(html_content)} chars) -> templates/index_new.html")
-    else:
-        print("❌ Could not find HTML_TEMPLATE")
-
-    # Extract AUTH_TEMPLATE as well
-    auth_match = re.search(r'AUTH_TEMPLATE\s*=\s*"""(.*?)"""', content, re.DOTALL)
-    if auth_match:
-        auth_html = auth_match.group(1).strip()
-        with open('templates/auth_new.html', 'w', encoding='utf-8') as f:
-            f.write(auth_html)
-        print(f"✅ Extracted AUTH_TEMPLATE ({len(auth_html)} chars) -> templates/auth_new.html")
-    else:
-        print("❌ Could not find AUTH_TEMPLATE")
+    os.makedirs('templates', exist_ok=True)
+    found = set()
+
+    # Map the source instead of reading it; template bodies are copied through as raw bytes
+    with open('tts_app19.py', 'rb') as src, \
+            mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as content:
+        for match in TEMPLATE_PATTERN.finditer(content):
+            name = match.group(1).decode('ascii')
+            if name in found:
+                continue
+            found.add(name)
+
+            html = match.group(2).strip()
+            output_path = TEMPLATE_TARGETS[name]
+            with open(output_path, 'wb') as f:
+                f.write(html)
+            print(f"✅ Extracted {name} ({len(html.decode('utf-8'))} chars) -> {output_path}")
+
+    for name in TEMPLATE_TARGETS:
+        if name not in found:
+            print(f"❌ Could not find {name}")
 
     print("\n📁 Templates extracted to templates/ directory")
     print("⚠️  Review the extracted files and rename them:")
@@ -1,10 +1,41 @@
 """
 VoiceVerse Features Package
+
+Submodules are imported lazily on first attribute access, so processes that
+only need analytics do not pay for the audio and batch processing modules.
 """
 
-from .analytics import UserAnalytics, CostEstimator
+import importlib
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    'UserAnalytics': 'analytics',
+    'CostEstimator': 'analytics',
+    'AnalyticsDB': 'analytics',
+    'get_analytics_db': 'analytics',
+    'AudioEnhancer': 'audio_filters',
+    'BatchProcessor': 'batch_processor',
+}
 
 __all__ = [
     'UserAnalytics',
-    'CostEstimator'
+    'CostEstimator',
+    'AnalyticsDB',
+    'get_analytics_db',
+    'AudioEnhancer',
+    'BatchProcessor'
 ]
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value  # Cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
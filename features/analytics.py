@@ -4,19 +4,187 @@ User Analytics and Cost Estimation
 Provides insights into user behavior and API usage costs
 """
 
+import json
 import sqlite3
-from typing import Dict, List, Optional, Tuple
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
 from collections import defaultdict
 
 
-class UserAnalytics:
+# Indexes backing the per-day/per-user aggregations. Day buckets are taken
+# as substr(created_at, 1, 10) on the ISO-8601 text so these stay usable.
+ANALYTICS_INDEXES = (
+    'CREATE INDEX IF NOT EXISTS idx_tts_history_user_created ON tts_history(user_id, created_at)',
+    'CREATE INDEX IF NOT EXISTS idx_tts_history_created ON tts_history(created_at)',
+    'CREATE INDEX IF NOT EXISTS idx_users_created ON users(created_at)',
+)
+
+
+def ensure_analytics_indexes(db_path: str) -> None:
     """
-    Analyze user behavior and usage patterns
+    Create the analytics indexes if the underlying tables exist
+
+    Args:
+        db_path: Path to SQLite database file
+    """
+    # Build every index in one explicit transaction: a single journal sync
+    # for the whole batch instead of one autocommit per statement.
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        conn.execute('PRAGMA synchronous = OFF')  # Connection-local, dropped on close
+        conn.execute('BEGIN')
+        try:
+            for statement in ANALYTICS_INDEXES:
+                try:
+                    conn.execute(statement)
+                except sqlite3.OperationalError:
+                    # Table not created yet - index will be added on a later start
+                    pass
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+    finally:
+        conn.close()
+
+
+# Rows pulled per fetchmany() call when streaming aggregate results
+FETCH_BATCH_SIZE = 2000
+
+
+def _fetch_pairs(cursor: sqlite3.Cursor) -> Dict:
+    """
+    Stream a two-column result set into a dict in bounded batches
+
+    Args:
+        cursor: Cursor that has executed a (key, value) SELECT
+
+    Returns:
+        Dict mapping the first column to the second
+    """
+    result = {}
+    while True:
+        rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+        if not rows:
+            break
+        result.update(rows)
+    return result
+
+
+# Drop a user's materialized stats on writes record_generation() does not fold
+# in as a delta. Inserts into tts_history are included so rows written by other
+# code paths also invalidate; record_generation() re-materializes after its own.
+STATS_CACHE_TRIGGERS = (
+    '''CREATE TRIGGER IF NOT EXISTS trg_stats_cache_tts_insert AFTER INSERT ON tts_history
+       BEGIN DELETE FROM user_stats_cache WHERE user_id = NEW.user_id; END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_stats_cache_tts_update AFTER UPDATE ON tts_history
+       BEGIN DELETE FROM user_stats_cache WHERE user_id IN (OLD.user_id, NEW.user_id); END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_stats_cache_tts_delete AFTER DELETE ON tts_history
+       BEGIN DELETE FROM user_stats_cache WHERE user_id = OLD.user_id; END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_stats_cache_saved_insert AFTER INSERT ON saved_audio
+       BEGIN DELETE FROM user_stats_cache WHERE user_id = NEW.user_id; END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_stats_cache_saved_update AFTER UPDATE ON saved_audio
+       BEGIN DELETE FROM user_stats_cache WHERE user_id IN (OLD.user_id, NEW.user_id); END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_stats_cache_saved_delete AFTER DELETE ON saved_audio
+       BEGIN DELETE FROM user_stats_cache WHERE user_id = OLD.user_id; END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_stats_cache_user_update
+       AFTER UPDATE OF username, created_at ON users
+       BEGIN DELETE FROM user_stats_cache WHERE user_id = OLD.id; END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_stats_cache_user_delete AFTER DELETE ON users
+       BEGIN DELETE FROM user_stats_cache WHERE user_id = OLD.id; END''',
+)
+
+
+class AnalyticsDB:
+    """
+    Shared SQLite connection for UserAnalytics and CostEstimator
+
+    One connection per database keeps a single page cache and statement
+    cache across every analytics query instead of reconnecting per call.
     """
 
     def __init__(self, db_path: str = 'voiceverse.db'):
         self.db_path = db_path
+        ensure_analytics_indexes(db_path)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        self._tune()
+        self._ensure_cache_table()
+
+    def _tune(self):
+        """Apply connection PRAGMAs for read-heavy aggregation queries"""
+        self.conn.execute('PRAGMA temp_store = MEMORY')  # GROUP BY temp b-trees
+        self.conn.execute('PRAGMA cache_size = -8000')   # ~8MB page cache
+
+    def _ensure_cache_table(self):
+        """Create the materialized per-user stats table"""
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS user_stats_cache (
+                user_id INTEGER NOT NULL,
+                days INTEGER NOT NULL,
+                json_blob TEXT NOT NULL,
+                stale_at TIMESTAMP NOT NULL,
+                PRIMARY KEY (user_id, days)
+            )
+        ''')
+        for statement in STATS_CACHE_TRIGGERS:
+            try:
+                self.conn.execute(statement)
+            except sqlite3.OperationalError:
+                # Table not created yet - trigger will be added on a later start
+                pass
+        self.conn.commit()
+
+    @contextmanager
+    def cursor(self):
+        """Context manager for a cursor on the shared connection, serialized across threads"""
+        with self._lock:
+            cursor = self.conn.cursor()
+            try:
+                yield cursor
+                self.conn.commit()
+            except Exception as e:
+                self.conn.rollback()
+                raise e
+            finally:
+                cursor.close()
+
+    def close(self):
+        """Close the shared connection"""
+        with self._lock:
+            self.conn.close()
+
+
+_analytics_dbs: Dict[str, AnalyticsDB] = {}
+_analytics_dbs_lock = threading.Lock()
+
+
+def get_analytics_db(db_path: str = 'voiceverse.db') -> AnalyticsDB:
+    """Get or create the process-wide AnalyticsDB for a database path"""
+    with _analytics_dbs_lock:
+        db = _analytics_dbs.get(db_path)
+        if db is None:
+            db = _analytics_dbs[db_path] = AnalyticsDB(db_path)
+        return db
+
+
+class UserAnalytics:
+    """
+    Analyze user behavior and usage patterns
+    """
+
+    # How long a materialized get_user_stats() result is served before the
+    # window is recomputed (rows ageing out of the window are not tracked)
+    STATS_CACHE_TTL = timedelta(minutes=5)
+
+    def __init__(self, db: Union[AnalyticsDB, str] = 'voiceverse.db'):
+        # A plain path still works and gets a private connection
+        self.db = db if isinstance(db, AnalyticsDB) else AnalyticsDB(db)
+        self.db_path = self.db.db_path
 
     def get_user_stats(self, user_id: int, days: int = 30) -> Dict:
         """
@@ -29,106 +197,187 @@ class UserAnalytics:
         Returns:
             Dict with user statistics
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cutoff_date = datetime.now() - timedelta(days=days)
+        with self.db.cursor() as cursor:
+            now = datetime.now()
+            cursor.execute('''
+                SELECT json_blob FROM user_stats_cache
+                WHERE user_id = ? AND days = ? AND stale_at > ?
+            ''', (user_id, days, now))
+            cached = cursor.fetchone()
+            if cached:
+                return json.loads(cached['json_blob'])
+
+            cutoff_date = now - timedelta(days=days)
+
+            # Basic user info
+            cursor.execute('SELECT username, created_at FROM users WHERE id = ?', (user_id,))
+            user = cursor.fetchone()
+
+            if not user:
+                return {'error': 'User not found'}
+
+            stats = {
+                'user_id': user_id,
+                'username': user['username'],
+                'member_since': user['created_at'],
+                'analysis_period_days': days
+            }
 
-        # Basic user info
-        cursor.execute('SELECT username, created_at FROM users WHERE id = ?', (user_id,))
-        user = cursor.fetchone()
+            # TTS generation stats
+            cursor.execute('''
+                SELECT
+                    COUNT(*) as total_generations,
+                    SUM(character_count) as total_characters,
+                    AVG(character_count) as avg_characters
+                FROM tts_history
+                WHERE user_id = ? AND created_at >= ?
+            ''', (user_id, cutoff_date))
+
+            tts_stats = cursor.fetchone()
+            stats['tts'] = {
+                'total_generations': tts_stats['total_generations'] or 0,
+                'total_characters': tts_stats['total_characters'] or 0,
+                'avg_characters_per_generation': round(tts_stats['avg_characters'] or 0, 2)
+            }
 
-        if not user:
-            conn.close()
-            return {'error': 'User not found'}
+            # Voice usage breakdown
+            cursor.execute('''
+                SELECT voice, COUNT(*) as count
+                FROM tts_history
+                WHERE user_id = ? AND created_at >= ?
+                GROUP BY voice
+                ORDER BY count DESC
+            ''', (user_id, cutoff_date))
+
+            voice_usage = _fetch_pairs(cursor)
+            stats['voice_usage'] = voice_usage
+
+            # Model usage breakdown
+            cursor.execute('''
+                SELECT model, COUNT(*) as count
+                FROM tts_history
+                WHERE user_id = ? AND created_at >= ?
+                GROUP BY model
+                ORDER BY count DESC
+            ''', (user_id, cutoff_date))
+
+            model_usage = _fetch_pairs(cursor)
+            stats['model_usage'] = model_usage
+
+            # Activity timeline (daily breakdown)
+            cursor.execute('''
+                SELECT substr(created_at, 1, 10) as date, COUNT(*) as count
+                FROM tts_history
+                WHERE user_id = ? AND created_at >= ?
+                GROUP BY substr(created_at, 1, 10)
+                ORDER BY date DESC
+            ''', (user_id, cutoff_date))
+
+            activity_timeline = _fetch_pairs(cursor)
+            stats['activity_timeline'] = activity_timeline
+
+            # Saved audio count
+            cursor.execute('''
+                SELECT COUNT(*) as saved_count
+                FROM saved_audio
+                WHERE user_id = ?
+            ''', (user_id,))
+
+            stats['saved_audio_count'] = cursor.fetchone()['saved_count']
+
+            # Document processing stats
+            cursor.execute('''
+                SELECT
+                    COUNT(DISTINCT CASE WHEN text LIKE '%.pdf%' THEN id END) as pdf_count,
+                    COUNT(DISTINCT CASE WHEN text LIKE '%.docx%' THEN id END) as docx_count
+                FROM tts_history
+                WHERE user_id = ? AND created_at >= ?
+            ''', (user_id, cutoff_date))
+
+            doc_stats = cursor.fetchone()
+            stats['document_processing'] = {
+                'pdf_files': doc_stats['pdf_count'] or 0,
+                'docx_files': doc_stats['docx_count'] or 0
+            }
 
-        stats = {
-            'user_id': user_id,
-            'username': user['username'],
-            'member_since': user['created_at'],
-            'analysis_period_days': days
-        }
+            cursor.execute('''
+                INSERT OR REPLACE INTO user_stats_cache (user_id, days, json_blob, stale_at)
+                VALUES (?, ?, ?, ?)
+            ''', (user_id, days, json.dumps(stats), now + self.STATS_CACHE_TTL))
 
-        # TTS generation stats
-        cursor.execute('''
-            SELECT
-                COUNT(*) as total_generations,
-                SUM(character_count) as total_characters,
-                AVG(character_count) as avg_characters
-            FROM tts_history
-            WHERE user_id = ? AND created_at >= ?
-        ''', (user_id, cutoff_date))
-
-        tts_stats = cursor.fetchone()
-        stats['tts'] = {
-            'total_generations': tts_stats['total_generations'] or 0,
-            'total_characters': tts_stats['total_characters'] or 0,
-            'avg_characters_per_generation': round(tts_stats['avg_characters'] or 0, 2)
-        }
+        return stats
 
-        # Voice usage breakdown
-        cursor.execute('''
-            SELECT voice, COUNT(*) as count
-            FROM tts_history
-            WHERE user_id = ? AND created_at >= ?
-            GROUP BY voice
-            ORDER BY count DESC
-        ''', (user_id, cutoff_date))
-
-        voice_usage = {row['voice']: row['count'] for row in cursor.fetchall()}
-        stats['voice_usage'] = voice_usage
-
-        # Model usage breakdown
-        cursor.execute('''
-            SELECT model, COUNT(*) as count
-            FROM tts_history
-            WHERE user_id = ? AND created_at >= ?
-            GROUP BY model
-            ORDER BY count DESC
-        ''', (user_id, cutoff_date))
-
-        model_usage = {row['model']: row['count'] for row in cursor.fetchall()}
-        stats['model_usage'] = model_usage
-
-        # Activity timeline (daily breakdown)
-        cursor.execute('''
-            SELECT DATE(created_at) as date, COUNT(*) as count
-            FROM tts_history
-            WHERE user_id = ? AND created_at >= ?
-            GROUP BY DATE(created_at)
-            ORDER BY date DESC
-        ''', (user_id, cutoff_date))
-
-        activity_timeline = {row['date']: row['count'] for row in cursor.fetchall()}
-        stats['activity_timeline'] = activity_timeline
-
-        # Saved audio count
-        cursor.execute('''
-            SELECT COUNT(*) as saved_count
-            FROM saved_audio
-            WHERE user_id = ?
-        ''', (user_id,))
-
-        stats['saved_audio_count'] = cursor.fetchone()['saved_count']
-
-        # Document processing stats
-        cursor.execute('''
-            SELECT
-                COUNT(DISTINCT CASE WHEN text LIKE '%.pdf%' THEN id END) as pdf_count,
-                COUNT(DISTINCT CASE WHEN text LIKE '%.docx%' THEN id END) as docx_count
-            FROM tts_history
-            WHERE user_id = ? AND created_at >= ?
-        ''', (user_id, cutoff_date))
-
-        doc_stats = cursor.fetchone()
-        stats['document_processing'] = {
-            'pdf_files': doc_stats['pdf_count'] or 0,
-            'docx_files': doc_stats['docx_count'] or 0
-        }
+    def record_generation(self, user_id: int, text: str, voice: str, model: str) -> None:
+        """
+        Record a TTS generation and fold it into the user's cached stats
 
-        conn.close()
-        return stats
+        Args:
+            user_id: User ID
+            text: Text that was converted
+            voice: Voice used
+            model: TTS model used
+        """
+        created_at = datetime.now()
+        character_count = len(text)
+
+        with self.db.cursor() as cursor:
+            # Read the cached windows first: the tts_history insert trigger
+            # drops them, and they are written back below with this row applied
+            cursor.execute('''
+                SELECT days, json_blob, stale_at FROM user_stats_cache
+                WHERE user_id = ? AND stale_at > ?
+            ''', (user_id, created_at))
+            cached = cursor.fetchall()
+
+            cursor.execute('''
+                INSERT INTO tts_history (user_id, text, voice, model, character_count, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (user_id, text, voice, model, character_count, created_at))
+
+            # Apply the single-row delta to every cached window in the same transaction
+            updates = []
+            for row in cached:
+                stats = json.loads(row['json_blob'])
+                self._apply_generation(stats, text, voice, model, character_count, created_at)
+                updates.append((user_id, row['days'], json.dumps(stats), row['stale_at']))
+
+            cursor.executemany('''
+                INSERT OR REPLACE INTO user_stats_cache (user_id, days, json_blob, stale_at)
+                VALUES (?, ?, ?, ?)
+            ''', updates)
+
+    @staticmethod
+    def _apply_generation(stats: Dict, text: str, voice: str, model: str,
+                          character_count: int, created_at: datetime) -> None:
+        """Update a get_user_stats() result in place with one new generation"""
+        tts = stats['tts']
+        tts['total_generations'] += 1
+        tts['total_characters'] += character_count
+        tts['avg_characters_per_generation'] = round(
+            tts['total_characters'] / tts['total_generations'], 2
+        )
+
+        # Keep the usage breakdowns ordered by count, highest first, as the
+        # GROUP BY ... ORDER BY count DESC queries return them
+        for key, name in (('voice_usage', voice), ('model_usage', model)):
+            usage = stats[key]
+            usage[name] = usage.get(name, 0) + 1
+            stats[key] = dict(sorted(usage.items(), key=lambda item: item[1], reverse=True))
+
+        # Timeline is newest-first, so a new day goes to the front
+        date = created_at.strftime('%Y-%m-%d')
+        timeline = stats['activity_timeline']
+        if date in timeline:
+            timeline[date] += 1
+        else:
+            stats['activity_timeline'] = {date: 1, **timeline}
+
+        # Case-insensitive, like SQL LIKE
+        lowered = text.lower()
+        if '.pdf' in lowered:
+            stats['document_processing']['pdf_files'] += 1
+        if '.docx' in lowered:
+            stats['document_processing']['docx_files'] += 1
 
     def get_global_stats(self, days: int = 30) -> Dict:
         """
@@ -140,83 +389,79 @@ class UserAnalytics:
         Returns:
             Global statistics
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cutoff_date = datetime.now() - timedelta(days=days)
-
-        stats = {'period_days': days}
-
-        # Total users
-        cursor.execute('SELECT COUNT(*) as count FROM users')
-        stats['total_users'] = cursor.fetchone()['count']
-
-        # Active users (generated TTS in period)
-        cursor.execute('''
-            SELECT COUNT(DISTINCT user_id) as count
-            FROM tts_history
-            WHERE created_at >= ?
-        ''', (cutoff_date,))
-        stats['active_users'] = cursor.fetchone()['count']
-
-        # TTS statistics
-        cursor.execute('''
-            SELECT
-                COUNT(*) as total_generations,
-                SUM(character_count) as total_characters,
-                AVG(character_count) as avg_characters
-            FROM tts_history
-            WHERE created_at >= ?
-        ''', (cutoff_date,))
-
-        tts_stats = cursor.fetchone()
-        stats['tts'] = {
-            'total_generations': tts_stats['total_generations'] or 0,
-            'total_characters': tts_stats['total_characters'] or 0,
-            'avg_characters': round(tts_stats['avg_characters'] or 0, 2)
-        }
+        with self.db.cursor() as cursor:
+            cutoff_date = datetime.now() - timedelta(days=days)
+
+            stats = {'period_days': days}
+
+            # Total users
+            cursor.execute('SELECT COUNT(*) as count FROM users')
+            stats['total_users'] = cursor.fetchone()['count']
+
+            # Active users (generated TTS in period)
+            cursor.execute('''
+                SELECT COUNT(DISTINCT user_id) as count
+                FROM tts_history
+                WHERE created_at >= ?
+            ''', (cutoff_date,))
+            stats['active_users'] = cursor.fetchone()['count']
+
+            # TTS statistics
+            cursor.execute('''
+                SELECT
+                    COUNT(*) as total_generations,
+                    SUM(character_count) as total_characters,
+                    AVG(character_count) as avg_characters
+                FROM tts_history
+                WHERE created_at >= ?
+            ''', (cutoff_date,))
+
+            tts_stats = cursor.fetchone()
+            stats['tts'] = {
+                'total_generations': tts_stats['total_generations'] or 0,
+                'total_characters': tts_stats['total_characters'] or 0,
+                'avg_characters': round(tts_stats['avg_characters'] or 0, 2)
+            }
 
-        # Most popular voices
-        cursor.execute('''
-            SELECT voice, COUNT(*) as count
-            FROM tts_history
-            WHERE created_at >= ?
-            GROUP BY voice
-            ORDER BY count DESC
-            LIMIT 5
-        ''', (cutoff_date,))
-
-        stats['popular_voices'] = {row['voice']: row['count'] for row in cursor.fetchall()}
-
-        # Most popular models
-        cursor.execute('''
-            SELECT model, COUNT(*) as count
-            FROM tts_history
-            WHERE created_at >= ?
-            GROUP BY model
-            ORDER BY count DESC
-        ''', (cutoff_date,))
-
-        stats['model_usage'] = {row['model']: row['count'] for row in cursor.fetchall()}
-
-        # Top users by generation count
-        cursor.execute('''
-            SELECT u.username, COUNT(h.id) as generation_count
-            FROM tts_history h
-            JOIN users u ON h.user_id = u.id
-            WHERE h.created_at >= ?
-            GROUP BY h.user_id
-            ORDER BY generation_count DESC
-            LIMIT 10
-        ''', (cutoff_date,))
-
-        stats['top_users'] = [
-            {'username': row['username'], 'generations': row['generation_count']}
-            for row in cursor.fetchall()
-        ]
+            # Most popular voices
+            cursor.execute('''
+                SELECT voice, COUNT(*) as count
+                FROM tts_history
+                WHERE created_at >= ?
+                GROUP BY voice
+                ORDER BY count DESC
+                LIMIT 5
+            ''', (cutoff_date,))
+
+            stats['popular_voices'] = _fetch_pairs(cursor)
+
+            # Most popular models
+            cursor.execute('''
+                SELECT model, COUNT(*) as count
+                FROM tts_history
+                WHERE created_at >= ?
+                GROUP BY model
+                ORDER BY count DESC
+            ''', (cutoff_date,))
+
+            stats['model_usage'] = _fetch_pairs(cursor)
+
+            # Top users by generation count
+            cursor.execute('''
+                SELECT u.username, COUNT(h.id) as generation_count
+                FROM tts_history h
+                JOIN users u ON h.user_id = u.id
+                WHERE h.created_at >= ?
+                GROUP BY h.user_id
+                ORDER BY generation_count DESC
+                LIMIT 10
+            ''', (cutoff_date,))
+
+            stats['top_users'] = [
+                {'username': row['username'], 'generations': row['generation_count']}
+                for row in cursor.fetchall()
+            ]
 
-        conn.close()
         return stats
 
     def get_usage_trends(self, days: int = 30) -> Dict:
@@ -229,46 +474,42 @@ class UserAnalytics:
         Returns:
             Trend data
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cutoff_date = datetime.now() - timedelta(days=days)
-
-        # Daily generation counts
-        cursor.execute('''
-            SELECT DATE(created_at) as date, COUNT(*) as count
-            FROM tts_history
-            WHERE created_at >= ?
-            GROUP BY DATE(created_at)
-            ORDER BY date
-        ''', (cutoff_date,))
-
-        daily_generations = {row['date']: row['count'] for row in cursor.fetchall()}
-
-        # Daily character counts
-        cursor.execute('''
-            SELECT DATE(created_at) as date, SUM(character_count) as total
-            FROM tts_history
-            WHERE created_at >= ?
-            GROUP BY DATE(created_at)
-            ORDER BY date
-        ''', (cutoff_date,))
-
-        daily_characters = {row['date']: row['total'] for row in cursor.fetchall()}
-
-        # New user signups
-        cursor.execute('''
-            SELECT DATE(created_at) as date, COUNT(*) as count
-            FROM users
-            WHERE created_at >= ?
-            GROUP BY DATE(created_at)
-            ORDER BY date
-        ''', (cutoff_date,))
-
-        daily_signups = {row['date']: row['count'] for row in cursor.fetchall()}
-
-        conn.close()
+        with self.db.cursor() as cursor:
+            cursor.row_factory = None  # Plain (date, value) tuples for _fetch_pairs
+            cutoff_date = datetime.now() - timedelta(days=days)
+
+            # Daily generation counts
+            cursor.execute('''
+                SELECT substr(created_at, 1, 10) as date, COUNT(*) as count
+                FROM tts_history
+                WHERE created_at >= ?
+                GROUP BY substr(created_at, 1, 10)
+                ORDER BY date
+            ''', (cutoff_date,))
+
+            daily_generations = _fetch_pairs(cursor)
+
+            # Daily character counts
+            cursor.execute('''
+                SELECT substr(created_at, 1, 10) as date, SUM(character_count) as total
+                FROM tts_history
+                WHERE created_at >= ?
+                GROUP BY substr(created_at, 1, 10)
+                ORDER BY date
+            ''', (cutoff_date,))
+
+            daily_characters = _fetch_pairs(cursor)
+
+            # New user signups
+            cursor.execute('''
+                SELECT substr(created_at, 1, 10) as date, COUNT(*) as count
+                FROM users
+                WHERE created_at >= ?
+                GROUP BY substr(created_at, 1, 10)
+                ORDER BY date
+            ''', (cutoff_date,))
+
+            daily_signups = _fetch_pairs(cursor)
 
         return {
             'daily_generations': daily_generations,
@@ -288,8 +529,21 @@ class CostEstimator:
         'tts-1-hd': 0.030    # $ per 1K characters
     }
 
-    def __init__(self, db_path: str = 'voiceverse.db'):
-        self.db_path = db_path
+    def __init__(self, db: Union[AnalyticsDB, str] = 'voiceverse.db'):
+        # A plain path still works and gets a private connection
+        self.db = db if isinstance(db, AnalyticsDB) else AnalyticsDB(db)
+        self.db_path = self.db.db_path
+        # Per-character cost, so each aggregated row needs a single multiply
+        self._cost_factor = {model: price / 1000.0 for model, price in self.PRICING.items()}
+        self._default_factor = self._cost_factor['tts-1']
+
+        # Pricing stays single-sourced here while the math runs inside the
+        # aggregation queries; deterministic lets SQLite reuse results
+        self.db.conn.create_function('tts_cost', 2, self._cost_of, deterministic=True)
+
+    def _cost_of(self, model: Optional[str], chars: Optional[int]) -> float:
+        """Cost in USD for a character count on a model (tts_cost SQL function)"""
+        return (chars or 0) * self._cost_factor.get(model, self._default_factor)
 
     def estimate_cost(self, text: str, model: str = 'tts-1') -> float:
         """
@@ -302,10 +556,7 @@ class CostEstimator:
         Returns:
             Estimated cost in USD
         """
-        char_count = len(text)
-        price_per_1k = self.PRICING.get(model, self.PRICING['tts-1'])
-
-        return (char_count / 1000) * price_per_1k
+        return self._cost_of(model, len(text))
 
     def get_user_costs(self, user_id: int, days: int = 30) -> Dict:
         """
@@ -318,36 +569,30 @@ class CostEstimator:
         Returns:
             Cost breakdown
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cutoff_date = datetime.now() - timedelta(days=days)
-
-        # Get all generations with character counts
-        cursor.execute('''
-            SELECT model, SUM(character_count) as total_chars
-            FROM tts_history
-            WHERE user_id = ? AND created_at >= ?
-            GROUP BY model
-        ''', (user_id, cutoff_date))
-
-        model_costs = {}
-        total_cost = 0
-
-        for row in cursor.fetchall():
-            model = row['model']
-            chars = row['total_chars'] or 0
-            price_per_1k = self.PRICING.get(model, self.PRICING['tts-1'])
-            cost = (chars / 1000) * price_per_1k
-
-            model_costs[model] = {
-                'characters': chars,
-                'cost_usd': round(cost, 4)
-            }
-            total_cost += cost
-
-        conn.close()
+        with self.db.cursor() as cursor:
+            cutoff_date = datetime.now() - timedelta(days=days)
+
+            # Get all generations with character counts
+            cursor.execute('''
+                SELECT
+                    model,
+                    SUM(character_count) as total_chars,
+                    tts_cost(model, SUM(character_count)) as cost
+                FROM tts_history
+                WHERE user_id = ? AND created_at >= ?
+                GROUP BY model
+            ''', (user_id, cutoff_date))
+
+            model_costs = {}
+            total_cost = 0
+
+            for row in cursor.fetchall():
+                cost = row['cost']
+                model_costs[row['model']] = {
+                    'characters': row['total_chars'] or 0,
+                    'cost_usd': round(cost, 4)
+                }
+                total_cost += cost
 
         return {
             'user_id': user_id,
@@ -366,57 +611,47 @@ class CostEstimator:
         Returns:
             Global cost breakdown
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cutoff_date = datetime.now() - timedelta(days=days)
-
-        # Get all generations
-        cursor.execute('''
-            SELECT model, SUM(character_count) as total_chars
-            FROM tts_history
-            WHERE created_at >= ?
-            GROUP BY model
-        ''', (cutoff_date,))
-
-        model_costs = {}
-        total_cost = 0
-
-        for row in cursor.fetchall():
-            model = row['model']
-            chars = row['total_chars'] or 0
-            price_per_1k = self.PRICING.get(model, self.PRICING['tts-1'])
-            cost = (chars / 1000) * price_per_1k
-
-            model_costs[model] = {
-                'characters': chars,
-                'cost_usd': round(cost, 4)
-            }
-            total_cost += cost
-
-        # Daily cost breakdown
-        cursor.execute('''
-            SELECT
-                DATE(created_at) as date,
-                model,
-                SUM(character_count) as total_chars
-            FROM tts_history
-            WHERE created_at >= ?
-            GROUP BY DATE(created_at), model
-            ORDER BY date DESC
-        ''', (cutoff_date,))
-
-        daily_costs = defaultdict(float)
-        for row in cursor.fetchall():
-            date = row['date']
-            model = row['model']
-            chars = row['total_chars'] or 0
-            price_per_1k = self.PRICING.get(model, self.PRICING['tts-1'])
-            cost = (chars / 1000) * price_per_1k
-            daily_costs[date] += cost
-
-        conn.close()
+        with self.db.cursor() as cursor:
+            cutoff_date = datetime.now() - timedelta(days=days)
+
+            # Get all generations
+            cursor.execute('''
+                SELECT
+                    model,
+                    SUM(character_count) as total_chars,
+                    tts_cost(model, SUM(character_count)) as cost
+                FROM tts_history
+                WHERE created_at >= ?
+                GROUP BY model
+            ''', (cutoff_date,))
+
+            model_costs = {}
+            total_cost = 0
+
+            for row in cursor.fetchall():
+                cost = row['cost']
+                model_costs[row['model']] = {
+                    'characters': row['total_chars'] or 0,
+                    'cost_usd': round(cost, 4)
+                }
+                total_cost += cost
+
+            # Daily cost breakdown
+            cursor.execute('''
+                SELECT date, SUM(cost) as cost
+                FROM (
+                    SELECT
+                        substr(created_at, 1, 10) as date,
+                        tts_cost(model, SUM(character_count)) as cost
+                    FROM tts_history
+                    WHERE created_at >= ?
+                    GROUP BY substr(created_at, 1, 10), model
+                )
+                GROUP BY date
+                ORDER BY date DESC
+            ''', (cutoff_date,))
+
+            daily_costs = _fetch_pairs(cursor)
 
         return {
             'period_days': days,
@@ -459,40 +694,30 @@ class CostEstimator:
         Returns:
             List of users with costs
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cutoff_date = datetime.now() - timedelta(days=days)
-
-        cursor.execute('''
-            SELECT
-                u.username,
-                h.user_id,
-                h.model,
-                SUM(h.character_count) as total_chars
-            FROM tts_history h
-            JOIN users u ON h.user_id = u.id
-            WHERE h.created_at >= ?
-            GROUP BY h.user_id, h.model
-        ''', (cutoff_date,))
-
-        user_costs = defaultdict(lambda: {'username': '', 'total_cost': 0, 'models': {}})
-
-        for row in cursor.fetchall():
-            user_id = row['user_id']
-            username = row['username']
-            model = row['model']
-            chars = row['total_chars'] or 0
-
-            price_per_1k = self.PRICING.get(model, self.PRICING['tts-1'])
-            cost = (chars / 1000) * price_per_1k
-
-            user_costs[user_id]['username'] = username
-            user_costs[user_id]['total_cost'] += cost
-            user_costs[user_id]['models'][model] = round(cost, 4)
-
-        conn.close()
+        with self.db.cursor() as cursor:
+            cutoff_date = datetime.now() - timedelta(days=days)
+
+            cursor.execute('''
+                SELECT
+                    u.username,
+                    h.user_id,
+                    h.model,
+                    tts_cost(h.model, SUM(h.character_count)) as cost
+                FROM tts_history h
+                JOIN users u ON h.user_id = u.id
+                WHERE h.created_at >= ?
+                GROUP BY h.user_id, h.model
+            ''', (cutoff_date,))
+
+            user_costs = defaultdict(lambda: {'username': '', 'total_cost': 0, 'models': {}})
+
+            for row in cursor.fetchall():
+                user_id = row['user_id']
+                cost = row['cost']
+
+                user_costs[user_id]['username'] = row['username']
+                user_costs[user_id]['total_cost'] += cost
+                user_costs[user_id]['models'][row['model']] = round(cost, 4)
 
         # Sort by total cost
         sorted_users = sorted(
@@ -8,22 +8,15 @@ import os
 import sys
 from pathlib import Path
 from typing import Dict, List
+import httpx
 from openai import OpenAI
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
-class FlaskTTSAgent:
-    """Specialized agent for Flask TTS applications"""
-    
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-        self.context = self._load_app_context()
-    
-    def _load_app_context(self) -> str:
-        """Load application-specific context"""
-        return """
+# Application context shared by every agent instance and prompt
+_CONTEXT = """
 You are analyzing a Flask-based Text-to-Speech (TTS) application called VoiceVerse with:
 
 TECH STACK:
@@ -64,12 +57,12 @@ COMMON PATTERNS:
 - File ownership validation
 - Error handling with try/except and user feedback
         """
-    
-    def analyze_route_security(self, code: str) -> str:
-        """Analyze Flask route for security issues"""
-        prompt = f"""{self.context}
 
-Analyze this Flask route for security vulnerabilities:
+# Every prompt starts with the context followed by a blank line
+_PROMPT_HEADER = _CONTEXT + "\n\n"
+
+# Per-method prompts: everything but the {code}/route slots is built once at import
+_ROUTE_SECURITY_PROMPT = _PROMPT_HEADER + """Analyze this Flask route for security vulnerabilities:
 
 ```python
 {code}
@@ -88,14 +81,8 @@ Check for:
 10. Authorization checks
 
 Provide specific fixes with code examples."""
-        
-        return self._query_openai(prompt)
-    
-    def generate_flask_tests(self, code: str) -> str:
-        """Generate tests specific to Flask routes"""
-        prompt = f"""{self.context}
 
-Generate comprehensive pytest test cases for this Flask route:
+_FLASK_TESTS_PROMPT = _PROMPT_HEADER + """Generate comprehensive pytest test cases for this Flask route:
 
 ```python
 {code}
@@ -114,14 +101,8 @@ Include:
 10. Security logging verification tests
 
 Use Flask test client and pytest fixtures."""
-        
-        return self._query_openai(prompt)
-    
-    def suggest_flask_improvements(self, code: str) -> str:
-        """Suggest Flask-specific improvements"""
-        prompt = f"""{self.context}
 
-Analyze this Flask code and suggest improvements:
+_IMPROVEMENTS_PROMPT = _PROMPT_HEADER + """Analyze this Flask code and suggest improvements:
 
 ```python
 {code}
@@ -140,20 +121,14 @@ Focus on:
 10. Testing coverage
 
 Provide before/after code examples."""
-        
-        return self._query_openai(prompt)
-    
-    def generate_route_boilerplate(self, route_spec: Dict) -> str:
-        """Generate Flask route boilerplate"""
-        prompt = f"""{self.context}
 
-Generate a complete Flask route with full security based on:
+_BOILERPLATE_PROMPT = _PROMPT_HEADER + """Generate a complete Flask route with full security based on:
 
-Route: {route_spec.get('path', '/api/endpoint')}
-Method: {route_spec.get('method', 'POST')}
-Purpose: {route_spec.get('purpose', 'API endpoint')}
-Auth Required: {route_spec.get('auth', True)}
-Rate Limit: {route_spec.get('rate_limit', '10 per minute')}
+Route: {path}
+Method: {method}
+Purpose: {purpose}
+Auth Required: {auth}
+Rate Limit: {rate_limit}
 
 Include:
 1. @login_required decorator (if auth required)
@@ -168,14 +143,8 @@ Include:
 10. Type hints
 
 Follow the VoiceVerse coding style."""
-        
-        return self._query_openai(prompt)
-    
-    def audit_database_queries(self, code: str) -> str:
-        """Audit database queries for SQL injection and performance"""
-        prompt = f"""{self.context}
 
-Audit database queries in this code:
+_DB_AUDIT_PROMPT = _PROMPT_HEADER + """Audit database queries in this code:
 
 ```python
 {code}
@@ -192,14 +161,8 @@ Check for:
 8. Connection leaks
 
 Provide safe alternatives and performance improvements."""
-        
-        return self._query_openai(prompt)
-    
-    def analyze_auth_flow(self, code: str) -> str:
-        """Analyze authentication and authorization logic"""
-        prompt = f"""{self.context}
 
-Analyze authentication/authorization in this code:
+_AUTH_FLOW_PROMPT = _PROMPT_HEADER + """Analyze authentication/authorization in this code:
 
 ```python
 {code}
@@ -218,6 +181,67 @@ Check for:
 10. Remember me functionality
 
 Provide security recommendations."""
+
+_client = None
+
+
+def _get_client() -> OpenAI:
+    """Get the process-wide OpenAI client so HTTPS connections stay warm"""
+    global _client
+    if _client is None:
+        _client = OpenAI(
+            api_key=os.getenv('OPENAI_API_KEY'),
+            http_client=httpx.Client(limits=httpx.Limits(max_keepalive_connections=10))
+        )
+    return _client
+
+
+class FlaskTTSAgent:
+    """Specialized agent for Flask TTS applications"""
+    
+    def __init__(self):
+        self.client = _get_client()
+        self.context = _CONTEXT  # Shared module constant, not a per-instance copy
+    
+    def analyze_route_security(self, code: str) -> str:
+        """Analyze Flask route for security issues"""
+        prompt = _ROUTE_SECURITY_PROMPT.format_map({'code': code})
+        
+        return self._query_openai(prompt)
+    
+    def generate_flask_tests(self, code: str) -> str:
+        """Generate tests specific to Flask routes"""
+        prompt = _FLASK_TESTS_PROMPT.format_map({'code': code})
+        
+        return self._query_openai(prompt)
+    
+    def suggest_flask_improvements(self, code: str) -> str:
+        """Suggest Flask-specific improvements"""
+        prompt = _IMPROVEMENTS_PROMPT.format_map({'code': code})
+        
+        return self._query_openai(prompt)
+    
+    def generate_route_boilerplate(self, route_spec: Dict) -> str:
+        """Generate Flask route boilerplate"""
+        prompt = _BOILERPLATE_PROMPT.format_map({
+            'path': route_spec.get('path', '/api/endpoint'),
+            'method': route_spec.get('method', 'POST'),
+            'purpose': route_spec.get('purpose', 'API endpoint'),
+            'auth': route_spec.get('auth', True),
+            'rate_limit': route_spec.get('rate_limit', '10 per minute')
+        })
+        
+        return self._query_openai(prompt)
+    
+    def audit_database_queries(self, code: str) -> str:
+        """Audit database queries for SQL injection and performance"""
+        prompt = _DB_AUDIT_PROMPT.format_map({'code': code})
+        
+        return self._query_openai(prompt)
+    
+    def analyze_auth_flow(self, code: str) -> str:
+        """Analyze authentication and authorization logic"""
+        prompt = _AUTH_FLOW_PROMPT.format_map({'code': code})
         
         return self._query_openai(prompt)
     
@@ -279,8 +303,7 @@ def main():
                 print("❌ Error: file argument required")
                 sys.exit(1)
             
-            with open(args.file, 'r') as f:
-                code = f.read()
+            code = Path(args.file).read_text(encoding='utf-8')
             
             if args.command == 'route-security':
                 result = agent.analyze_route_security(code)
@@ -294,8 +317,7 @@ def main():
                 result = agent.analyze_auth_flow(code)
         
         if args.output:
-            with open(args.output, 'w') as f:
-                f.write(result)
+            Path(args.output).write_text(result, encoding='utf-8')
             print(f"✅ Written to {args.output}")
         else:
             print("\n" + "="*80)
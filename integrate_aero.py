@@ -4,11 +4,35 @@ Integration script for Windows Vista/7 Aero Dashboard
 This script will guide you through integrating the Aero interface into your existing TTS app.
 """
 
+import mmap
 import os
+import re
 import sys
 import shutil
 from pathlib import Path
 
+# Buffer size for whole-file rewrites of tts_app19.py (default is 8 KiB)
+REWRITE_BUFFER_SIZE = 1 << 18
+
+# Leaf directories only - makedirs creates the shared parents
+AERO_DIRECTORIES = ('static/css', 'static/js', 'templates')
+
+# Top-level import statements, matched on the raw bytes of tts_app19.py
+IMPORT_LINE_PATTERN = re.compile(rb'^(?:from|import)\s', re.MULTILINE)
+
+def write_if_changed(path, content):
+    """Write content to path unless the file already holds exactly that content"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True
+
 def check_files_exist():
     """Check if all required Aero files are present"""
     required_files = [
@@ -34,35 +58,45 @@ def check_files_exist():
 
 def create_directories():
     """Create necessary directories if they don't exist"""
-    dirs = ['static/css', 'static/js', 'templates']
-    for dir_path in dirs:
-        os.makedirs(dir_path, exist_ok=True)
+    for dir_path in AERO_DIRECTORIES:
+        if not os.path.isdir(dir_path):
+            os.makedirs(dir_path, exist_ok=True)
         print(f"✅ Directory ensured: {dir_path}")
 
 def add_import_to_main():
     """Add the import statement to tts_app19.py"""
-    import_line = "from aero_routes import add_aero_routes\n"
+    import_line = b"from aero_routes import add_aero_routes\n"
 
     try:
-        with open('tts_app19.py', 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        if 'from aero_routes import add_aero_routes' in content:
-            print("✅ Import already exists in tts_app19.py")
-            return True
-
-        # Find a good place to add the import (after other imports)
-        lines = content.split('\n')
-        import_index = 0
-
-        for i, line in enumerate(lines):
-            if line.startswith('from') or line.startswith('import'):
-                import_index = i + 1
-
-        lines.insert(import_index, import_line)
-
-        with open('tts_app19.py', 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
+        # Scan through a read-only mapping so the common "already added" case never copies the file
+        with open('tts_app19.py', 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if mapped.find(b'from aero_routes import add_aero_routes') != -1:
+                print("✅ Import already exists in tts_app19.py")
+                return True
+
+            # Find a good place to add the import (after the last top-level import)
+            last_import = None
+            for last_import in IMPORT_LINE_PATTERN.finditer(mapped):
+                pass
+
+            if last_import is None:
+                offset = 0
+            else:
+                offset = mapped.find(b'\n', last_import.end()) + 1
+
+            # Copy out before the mapping closes - the file is rewritten below
+            content = mapped[:]
+
+        if last_import is not None and offset == 0:
+            # Last import is the final line and has no trailing newline
+            content += b'\n'
+            offset = len(content)
+
+        with open('tts_app19.py', 'wb', buffering=REWRITE_BUFFER_SIZE) as f:
+            f.write(content[:offset])
+            f.write(import_line)
+            f.write(content[offset:])
 
         print("✅ Added import statement to tts_app19.py")
         return True
@@ -79,7 +113,47 @@ def create_simple_integration_route():
 # Add this code to your tts_app19.py file after app initialization
 # ============================================================================
 
-from flask import render_template
+import queue
+import re
+import sqlite3
+from contextlib import contextmanager
+from flask import render_template, Response
+
+try:
+    import orjson  # Optional: faster JSON encoding for the audio file list
+except ImportError:
+    orjson = None
+
+_MP3_SUFFIX_RE = re.compile(r'\\.mp3$')
+
+class AeroConnectionPool:
+    """Pre-opened SQLite connections reused across Aero API requests"""
+
+    def __init__(self, db_path, size=8):
+        self._connections = queue.Queue(maxsize=size)
+        for _ in range(size):
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA cache_size=-65536')
+            conn.execute('PRAGMA mmap_size=268435456')
+            self._connections.put(conn)
+
+    @contextmanager
+    def acquire(self):
+        """Borrow a connection, returning it to the pool afterwards"""
+        conn = self._connections.get()
+        try:
+            yield conn
+        finally:
+            self._connections.put(conn)
+
+aero_db_pool = AeroConnectionPool(db.db_path)
+
+# Serves the per-user, newest-first listing below without a full scan + sort
+with aero_db_pool.acquire() as conn:
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_audio_user_created ON audio_files(user_id, created_at DESC)')
+    conn.commit()
 
 @app.route('/dashboard')
 @login_required
@@ -107,43 +181,61 @@ def api_get_audio_files():
     """API endpoint to get user's audio files for Aero dashboard"""
     user_id = session.get('user_id')
 
-    conn = db.get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT filename, voice, speed, text_preview, group_name,
-               file_path, created_at
-        FROM audio_files
-        WHERE user_id = ?
-        ORDER BY created_at DESC
-        LIMIT 50
-    """, (user_id,))
-
-    files = []
-    for row in cursor.fetchall():
-        files.append({
+    with aero_db_pool.acquire() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT filename, voice, speed, group_name,
+                   file_path, created_at
+            FROM audio_files
+            WHERE user_id = ?
+            ORDER BY created_at DESC
+            LIMIT 50
+        """, (user_id,))
+        rows = cursor.fetchall()
+
+    files = [
+        {
             'filename': row[0],
             'voice': row[1],
             'speed': row[2],
-            'text_preview': row[3],
-            'group': row[4],
-            'file_path': row[5],
-            'created_at': row[6] if row[6] else None,
-            'display_name': row[0].replace('_', ' ').replace('.mp3', '') if row[0] else 'Audio File'
-        })
-
-    conn.close()
+            'group': row[3],
+            'file_path': row[4],
+            'created_at': row[5] if row[5] else None,
+            'display_name': _MP3_SUFFIX_RE.sub('', row[0].replace('_', ' ')) if row[0] else 'Audio File'
+        }
+        for row in rows
+    ]
+
+    if orjson is not None:
+        return Response(orjson.dumps(files), mimetype='application/json')
     return jsonify(files)
 
+@app.route('/api/audio-files/<filename>/preview', methods=['GET'])
+@login_required
+def api_get_audio_file_preview(filename):
+    """Text preview for one audio file, loaded when the item is expanded"""
+    user_id = session.get('user_id')
+
+    with aero_db_pool.acquire() as conn:
+        row = conn.execute(
+            'SELECT text_preview FROM audio_files WHERE user_id = ? AND filename = ?',
+            (user_id, filename)
+        ).fetchone()
+
+    if row is None:
+        return jsonify({'error': 'File not found'}), 404
+    return jsonify({'filename': filename, 'text_preview': row[0]})
+
 # ============================================================================
 # END OF AERO DASHBOARD INTEGRATION
 # ============================================================================
 '''
 
-    with open('aero_integration_code.py', 'w', encoding='utf-8') as f:
-        f.write(integration_code)
-
-    print("✅ Created aero_integration_code.py with route code to add manually")
+    if write_if_changed('aero_integration_code.py', integration_code):
+        print("✅ Created aero_integration_code.py with route code to add manually")
+    else:
+        print("✅ aero_integration_code.py is already up to date")
     return True
 
 def create_launch_script():
@@ -154,23 +246,95 @@ Launch script for VoiceVerse with Aero Dashboard
 """
 
 import os
+import selectors
+import socket
 import subprocess
 import sys
 import time
 import signal
 
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Child output is batched and written once this much is buffered, or after this long
+OUTPUT_FLUSH_BYTES = 16384
+OUTPUT_FLUSH_INTERVAL = 0.05
+
 def kill_port_5000():
     """Kill any process using port 5000"""
+    # Nothing listening means nothing to kill - skip the process scan entirely
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        if probe.connect_ex(('127.0.0.1', 5000)) != 0:
+            return
+
+    pids = None
+    if psutil is not None:
+        try:
+            pids = {
+                conn.pid for conn in psutil.net_connections(kind='inet')
+                if conn.pid and conn.laddr and conn.laddr.port == 5000
+                and conn.status == psutil.CONN_LISTEN
+            }
+        except psutil.AccessDenied:
+            pids = None  # e.g. macOS without root
+
+    # No visible owner (psutil missing, access denied, or the socket belongs
+    # to another user) - fall back to killing the app by name
+    killed = False
     try:
-        result = subprocess.run(['lsof', '-ti:5000'], capture_output=True, text=True)
-        if result.stdout.strip():
-            pids = result.stdout.strip().split('\\n')
+        if not pids:
+            killed = subprocess.run(['pkill', '-9', '-f', 'tts_app19.py']).returncode == 0
+        else:
             for pid in pids:
-                subprocess.run(['kill', '-9', pid])
-            print("✅ Cleared port 5000")
+                os.kill(pid, signal.SIGKILL)
+                killed = True
     except:
         pass
 
+    if killed:
+        print("✅ Cleared port 5000")
+    else:
+        print("⚠️  Port 5000 is still in use by another process - the app may fail to start")
+
+def stream_output(process):
+    """Copy the child's stdout and stderr to ours in batched raw writes"""
+    sinks = {
+        process.stdout: (sys.stdout.buffer, bytearray()),
+        process.stderr: (sys.stderr.buffer, bytearray())
+    }
+
+    def flush():
+        for sink, buf in sinks.values():
+            if buf:
+                sink.write(buf)
+                sink.flush()
+                buf.clear()
+
+    selector = selectors.DefaultSelector()
+    for pipe in sinks:
+        selector.register(pipe, selectors.EVENT_READ)
+
+    last_flush = time.monotonic()
+    try:
+        while selector.get_map():
+            for key, _ in selector.select(timeout=OUTPUT_FLUSH_INTERVAL):
+                chunk = os.read(key.fd, 65536)
+                if chunk:
+                    sinks[key.fileobj][1].extend(chunk)
+                else:
+                    selector.unregister(key.fileobj)
+
+            now = time.monotonic()
+            if (now - last_flush >= OUTPUT_FLUSH_INTERVAL or
+                    any(len(buf) >= OUTPUT_FLUSH_BYTES for _, buf in sinks.values())):
+                flush()
+                last_flush = now
+    finally:
+        flush()
+        selector.close()
+
 def launch_app():
     """Launch the TTS app with Aero dashboard"""
     print("🚀 Launching VoiceVerse with Windows Vista/7 Aero UI...")
@@ -185,22 +349,17 @@ def launch_app():
         process = subprocess.Popen(
             ['python3', 'tts_app19.py'],
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1
+            stderr=subprocess.PIPE
         )
 
         print("✅ Application started!")
         print("📌 Access the Aero Dashboard at: http://localhost:5000/dashboard")
         print("📌 Access the classic interface at: http://localhost:5000/")
         print("-" * 50)
-        print("Press Ctrl+C to stop the server")
+        print("Press Ctrl+C to stop the server", flush=True)
 
-        # Wait for the process
-        while True:
-            line = process.stdout.readline()
-            if line:
-                print(line.strip())
+        stream_output(process)
+        process.wait()
 
     except KeyboardInterrupt:
         print("\\n🛑 Shutting down...")
@@ -213,8 +372,9 @@ if __name__ == "__main__":
     launch_app()
 '''
 
-    with open('launch_aero.py', 'w', encoding='utf-8') as f:
-        f.write(launch_script)
+    if not write_if_changed('launch_aero.py', launch_script):
+        print("✅ launch_aero.py is already up to date")
+        return True
 
     # Make it executable
     os.chmod('launch_aero.py', 0o755)
@@ -4,23 +4,95 @@ Launch script for VoiceVerse with Aero Dashboard
 """
 
 import os
+import selectors
+import socket
 import subprocess
 import sys
 import time
 import signal
 
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Child output is batched and written once this much is buffered, or after this long
+OUTPUT_FLUSH_BYTES = 16384
+OUTPUT_FLUSH_INTERVAL = 0.05
+
 def kill_port_5000():
     """Kill any process using port 5000"""
+    # Nothing listening means nothing to kill - skip the process scan entirely
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        if probe.connect_ex(('127.0.0.1', 5000)) != 0:
+            return
+
+    pids = None
+    if psutil is not None:
+        try:
+            pids = {
+                conn.pid for conn in psutil.net_connections(kind='inet')
+                if conn.pid and conn.laddr and conn.laddr.port == 5000
+                and conn.status == psutil.CONN_LISTEN
+            }
+        except psutil.AccessDenied:
+            pids = None  # e.g. macOS without root
+
+    # No visible owner (psutil missing, access denied, or the socket belongs
+    # to another user) - fall back to killing the app by name
+    killed = False
     try:
-        result = subprocess.run(['lsof', '-ti:5000'], capture_output=True, text=True)
-        if result.stdout.strip():
-            pids = result.stdout.strip().split('\n')
+        if not pids:
+            killed = subprocess.run(['pkill', '-9', '-f', 'tts_app19.py']).returncode == 0
+        else:
             for pid in pids:
-                subprocess.run(['kill', '-9', pid])
-            print("✅ Cleared port 5000")
+                os.kill(pid, signal.SIGKILL)
+                killed = True
     except:
         pass
 
+    if killed:
+        print("✅ Cleared port 5000")
+    else:
+        print("⚠️  Port 5000 is still in use by another process - the app may fail to start")
+
+def stream_output(process):
+    """Copy the child's stdout and stderr to ours in batched raw writes"""
+    sinks = {
+        process.stdout: (sys.stdout.buffer, bytearray()),
+        process.stderr: (sys.stderr.buffer, bytearray())
+    }
+
+    def flush():
+        for sink, buf in sinks.values():
+            if buf:
+                sink.write(buf)
+                sink.flush()
+                buf.clear()
+
+    selector = selectors.DefaultSelector()
+    for pipe in sinks:
+        selector.register(pipe, selectors.EVENT_READ)
+
+    last_flush = time.monotonic()
+    try:
+        while selector.get_map():
+            for key, _ in selector.select(timeout=OUTPUT_FLUSH_INTERVAL):
+                chunk = os.read(key.fd, 65536)
+                if chunk:
+                    sinks[key.fileobj][1].extend(chunk)
+                else:
+                    selector.unregister(key.fileobj)
+
+            now = time.monotonic()
+            if (now - last_flush >= OUTPUT_FLUSH_INTERVAL or
+                    any(len(buf) >= OUTPUT_FLUSH_BYTES for _, buf in sinks.values())):
+                flush()
+                last_flush = now
+    finally:
+        flush()
+        selector.close()
+
 def launch_app():
     """Launch the TTS app with Aero dashboard"""
     print("🚀 Launching VoiceVerse with Windows Vista/7 Aero UI...")
@@ -35,22 +107,17 @@ def launch_app():
         process = subprocess.Popen(
             ['python3', 'tts_app19.py'],
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1
+            stderr=subprocess.PIPE
         )
 
         print("✅ Application started!")
         print("📌 Access the Aero Dashboard at: http://localhost:5000/dashboard")
         print("📌 Access the classic interface at: http://localhost:5000/")
         print("-" * 50)
-        print("Press Ctrl+C to stop the server")
+        print("Press Ctrl+C to stop the server", flush=True)
 
-        # Wait for the process
-        while True:
-            line = process.stdout.readline()
-            if line:
-                print(line.strip())
+        stream_output(process)
+        process.wait()
 
     except KeyboardInterrupt:
         print("\n🛑 Shutting down...")
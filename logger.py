@@ -9,9 +9,193 @@ import logging.config
 import json
 import hashlib
 import os
-from datetime import datetime
+import sys
+import re
+import queue
+import threading
+import atexit
+import time
+from functools import lru_cache
 from typing import Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Maximum number of security events waiting to be written to the database
+DB_LOG_QUEUE_SIZE = 10000
+
+# Maximum number of queued security events written per database transaction
+DB_LOG_BATCH_SIZE = 256
+
+# Event types for successful file actions, built once instead of per call
+_FILE_EVENT_TYPES = {
+    action: sys.intern(f'FILE_{action}')
+    for action in ('ACCESS', 'DOWNLOAD', 'DELETE', 'UPLOAD')
+}
+
+# Email addresses: keep the first character of the local part, mask the rest
+_EMAIL_RE = re.compile(r'([^\s@])[^\s@]*(@[^\s@]+)')
+
+# (second, formatted prefix) of the last timestamp; replaced as one tuple so
+# concurrent callers always see a matching pair
+_timestamp_cache = (0, '')
+
+
+def _utc_timestamp() -> str:
+    """ISO 8601 UTC timestamp with microseconds, formatting the date part once per second"""
+    global _timestamp_cache
+    now = time.time()
+    second = int(now)
+    cached_second, prefix = _timestamp_cache
+    if second != cached_second:
+        prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second))
+        _timestamp_cache = (second, prefix)
+    return f"{prefix}.{int((now - second) * 1e6):06d}Z"
+
+
+def _json_dumps(data: dict) -> str:
+    """Serialize a log payload, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data).decode()
+    return json.dumps(data)
+
+
+class _SecurityEvent:
+    """Log message wrapper that defers JSON serialization until a handler emits it"""
+
+    __slots__ = ('data',)
+
+    def __init__(self, data: dict):
+        self.data = data
+
+    def __str__(self) -> str:
+        return _json_dumps(self.data)
+
+
+class SecurityJSONFormatter(logging.Formatter):
+    """
+    Formatter that writes each record as one JSON object
+
+    Security events are embedded as structured data rather than as a
+    pre-rendered string, so they are serialized exactly once per emitted line.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.msg.data if isinstance(record.msg, _SecurityEvent) else record.getMessage()
+        return _json_dumps({
+            'timestamp': self.formatTime(record, self.datefmt),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': message
+        })
+
+
+@lru_cache(maxsize=4096)
+def _hash_ip_cached(ip_address: str, salt: bytes) -> str:
+    """Keyed BLAKE2b-64 of an IP address (16 hex characters), memoized per (IP, salt)"""
+    return hashlib.blake2b(ip_address.encode(), digest_size=8, key=salt).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _configure_logging() -> logging.Logger:
+    """
+    Apply logging_config.json once per process
+
+    Returns:
+        The 'security' logger
+    """
+    # Load logging configuration if available
+    config_path = os.path.join(os.path.dirname(__file__), 'logging_config.json')
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, 'rb') as f:
+                config = json.load(f)
+            logging.config.dictConfig(config)
+        except Exception as e:
+            print(f"Warning: Could not load logging config: {e}")
+            # Fallback to basic config
+            logging.basicConfig(level=logging.INFO)
+    else:
+        # Fallback to basic config if file doesn't exist
+        logging.basicConfig(level=logging.INFO)
+
+    return logging.getLogger('security')
+
+
+# Security events waiting to be written to the database, as (db, event) pairs.
+# One queue and one writer thread are shared by every SecurityLogger.
+_db_log_queue: queue.Queue = queue.Queue(maxsize=DB_LOG_QUEUE_SIZE)
+_db_writer_thread: Optional[threading.Thread] = None
+_db_writer_lock = threading.Lock()
+_db_writer_atexit_registered = False
+
+
+def _db_writer():
+    """Drain queued security events into their databases until stopped"""
+    running = True
+    while running:
+        batch = []
+        item = _db_log_queue.get()
+        while True:
+            # The None sentinel from _stop_db_writer() ends the run; events
+            # queued behind it stay for the next writer
+            if item is None:
+                running = False
+                break
+            batch.append(item)
+            if len(batch) >= DB_LOG_BATCH_SIZE:
+                break
+            try:
+                item = _db_log_queue.get_nowait()
+            except queue.Empty:
+                break
+
+        # Group by database so each one gets a single batched write
+        events_by_db = {}
+        for db, event in batch:
+            events_by_db.setdefault(id(db), (db, []))[1].append(event)
+
+        for db, events in events_by_db.values():
+            try:
+                write_batch = getattr(db, 'log_security_events_batch', None)
+                if write_batch is not None:
+                    write_batch(events)
+                else:
+                    for event in events:
+                        db.log_security_event(**event)
+            except Exception as e:
+                # If database logging fails, log the error but don't crash
+                logging.getLogger('security').error(f"Failed to log to database: {e}")
+
+
+def _start_db_writer():
+    """Start the shared database writer thread if it is not running"""
+    global _db_writer_thread, _db_writer_atexit_registered
+    with _db_writer_lock:
+        if _db_writer_thread is not None:
+            return
+        _db_writer_thread = threading.Thread(
+            target=_db_writer, name='security-db-log', daemon=True
+        )
+        _db_writer_thread.start()
+        if not _db_writer_atexit_registered:
+            atexit.register(_stop_db_writer)
+            _db_writer_atexit_registered = True
+
+
+def _stop_db_writer():
+    """Flush queued database writes and stop the shared writer thread"""
+    global _db_writer_thread
+    with _db_writer_lock:
+        if _db_writer_thread is None:
+            return
+        _db_log_queue.put(None)
+        _db_writer_thread.join()
+        _db_writer_thread = None
+
 
 class SecurityLogger:
     """
@@ -20,7 +204,7 @@ class SecurityLogger:
     Features:
     - JSON-formatted security audit logs
     - PII sanitization (email masking, IP hashing)
-    - Database persistence for security events
+    - Database persistence for security events (written by a background thread)
     - Multiple log levels (INFO, WARNING, ERROR)
     """
 
@@ -33,22 +217,22 @@ class SecurityLogger:
         """
         self.db = db
 
-        # Load logging configuration if available
-        config_path = os.path.join(os.path.dirname(__file__), 'logging_config.json')
-        if os.path.exists(config_path):
-            try:
-                with open(config_path, 'r') as f:
-                    config = json.load(f)
-                    logging.config.dictConfig(config)
-            except Exception as e:
-                print(f"Warning: Could not load logging config: {e}")
-                # Fallback to basic config
-                logging.basicConfig(level=logging.INFO)
-        else:
-            # Fallback to basic config if file doesn't exist
-            logging.basicConfig(level=logging.INFO)
+        # Salt for IP anonymization (use environment variable in production).
+        # Read here rather than at import so values loaded by load_dotenv()
+        # after `import logger` are honoured; BLAKE2b keys are at most 64 bytes.
+        self._ip_salt = os.getenv('IP_HASH_SALT', 'voiceverse-security-salt').encode()[:64]
 
-        self.logger = logging.getLogger('security')
+        self.logger = _configure_logging()
+
+        # Database writes happen off the request path, on the shared writer
+        self.dropped_events = 0
+        self._db_enabled = hasattr(db, 'log_security_event')
+        if self._db_enabled:
+            _start_db_writer()
+
+    def close(self):
+        """Flush pending database writes and stop the shared writer thread"""
+        _stop_db_writer()
 
     def _sanitize_pii(self, data: Optional[str]) -> str:
         """
@@ -67,16 +251,19 @@ class SecurityLogger:
         if not data:
             return 'N/A'
 
-        # Mask email addresses
-        if isinstance(data, str) and '@' in data:
-            parts = data.split('@')
-            if len(parts) == 2:
-                # Mask username part: keep first char, mask rest
-                username = parts[0]
-                if len(username) > 0:
-                    return username[0] + '***@' + parts[1]
+        if not isinstance(data, str):
+            return str(data)
+
+        head, sep, tail = data.partition('@')
+        if not sep:
+            return data
+
+        # A bare address (the usual username case) is masked without the regex
+        if head and tail and '@' not in tail and ' ' not in data and data.isprintable():
+            return head[0] + '***@' + tail
 
-        return str(data)
+        # Mask every email address in the string
+        return _EMAIL_RE.sub(r'\1***\2', data)
 
     def _hash_ip(self, ip_address: Optional[str]) -> str:
         """
@@ -86,16 +273,12 @@ class SecurityLogger:
             ip_address: IP address to hash
 
         Returns:
-            SHA256 hash of IP (first 16 characters)
+            Keyed BLAKE2b hash of IP (16 characters)
         """
         if not ip_address:
             return 'unknown'
 
-        # Create hash with salt (use environment variable in production)
-        salt = os.getenv('IP_HASH_SALT', 'voiceverse-security-salt')
-        combined = f"{ip_address}{salt}"
-        hash_obj = hashlib.sha256(combined.encode())
-        return hash_obj.hexdigest()[:16]
+        return _hash_ip_cached(ip_address, self._ip_salt)
 
     def log_event(
         self,
@@ -105,7 +288,8 @@ class SecurityLogger:
         ip_address: Optional[str] = None,
         details: Optional[str] = None,
         success: bool = True,
-        level: str = 'INFO'
+        level: str = 'INFO',
+        details_args: tuple = ()
     ):
         """
         Log security event to both file and database
@@ -132,49 +316,54 @@ class SecurityLogger:
             user_id: Database ID of user (optional)
             username: Username (will be sanitized)
             ip_address: IP address of request
-            details: Additional event details
+            details: Additional event details (a %-format string if details_args is given)
             success: Whether the event succeeded
             level: Log level (INFO, WARNING, ERROR)
+            details_args: Arguments formatted into details only if the event is recorded
         """
 
-        # Create structured log data
-        log_data = {
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
-            'event_type': event_type,
-            'user_id': user_id if user_id else None,
-            'username': self._sanitize_pii(username) if username else 'anonymous',
-            'ip_hash': self._hash_ip(ip_address),
-            'details': details if details else '',
-            'success': success
-        }
-
-        # Log to file (JSON format)
-        log_message = json.dumps(log_data)
-
         if success:
-            if level == 'WARNING':
-                self.logger.warning(log_message)
-            else:
-                self.logger.info(log_message)
+            log_level = logging.WARNING if level == 'WARNING' else logging.INFO
         else:
-            if level == 'ERROR':
-                self.logger.error(log_message)
-            else:
-                self.logger.warning(log_message)
-
-        # Log to database
-        try:
-            if hasattr(self.db, 'log_security_event'):
-                self.db.log_security_event(
-                    event_type=event_type,
-                    user_id=user_id,
-                    ip_address=ip_address if ip_address else 'unknown',
-                    details=details,
-                    success=success
-                )
-        except Exception as e:
-            # If database logging fails, log the error but don't crash
-            self.logger.error(f"Failed to log to database: {e}")
+            log_level = logging.ERROR if level == 'ERROR' else logging.WARNING
+
+        file_enabled = self.logger.isEnabledFor(log_level)
+        if not file_enabled and not self._db_enabled:
+            return
+
+        if details_args:
+            details = details % details_args
+
+        # Only build and serialize the record if the file logger will emit it
+        if file_enabled:
+            # Create structured log data
+            log_data = {
+                'timestamp': _utc_timestamp(),
+                'event_type': event_type,
+                'user_id': user_id if user_id else None,
+                'username': self._sanitize_pii(username) if username else 'anonymous',
+                'ip_hash': self._hash_ip(ip_address),
+                'details': details if details else '',
+                'success': success
+            }
+
+            # Log to file (serialized by the handler's formatter on emit)
+            self.logger.log(log_level, _SecurityEvent(log_data))
+
+        # Queue for the database writer thread (restarted if close() stopped it)
+        if self._db_enabled:
+            if _db_writer_thread is None:
+                _start_db_writer()
+            try:
+                _db_log_queue.put_nowait((self.db, {
+                    'event_type': event_type,
+                    'user_id': user_id,
+                    'ip_address': ip_address if ip_address else 'unknown',
+                    'details': details,
+                    'success': success
+                }))
+            except queue.Full:
+                self.dropped_events += 1
 
     def log_authentication(
         self,
@@ -280,18 +469,17 @@ class SecurityLogger:
             user_id: User ID
         """
         if success:
-            event_type = f'FILE_{action}'
+            event_type = _FILE_EVENT_TYPES.get(action) or f'FILE_{action}'
         else:
             event_type = 'FILE_ACCESS_DENIED'
 
-        details = f"File: {filename}, Action: {action}"
-
         self.log_event(
             event_type=event_type,
             user_id=user_id,
             username=username,
             ip_address=ip_address,
-            details=details,
+            details="File: %s, Action: %s",
+            details_args=(filename, action),
             success=success,
             level='INFO' if success else 'WARNING'
         )
@@ -315,14 +503,14 @@ class SecurityLogger:
             user_id: User ID
         """
         event_type = 'RATE_LIMIT_EXCEEDED' if exceeded else 'RATE_LIMIT_HIT'
-        details = f"Endpoint: {endpoint}"
 
         self.log_event(
             event_type=event_type,
             user_id=user_id,
             username=username,
             ip_address=ip_address,
-            details=details,
+            details="Endpoint: %s",
+            details_args=(endpoint,),
             success=not exceeded,
             level='WARNING' if exceeded else 'INFO'
         )
@@ -345,14 +533,13 @@ class SecurityLogger:
             owner_username: Actual owner of the file
             user_id: User ID of violator
         """
-        details = f"File: {filename}, Owner: {owner_username}"
-
         self.log_event(
             event_type='OWNERSHIP_VIOLATION',
             user_id=user_id,
             username=username,
             ip_address=ip_address,
-            details=details,
+            details="File: %s, Owner: %s",
+            details_args=(filename, owner_username),
             success=False,
             level='WARNING'
         )
@@ -11,11 +11,19 @@ Usage:
 """
 
 import os
+import re
 import sys
+import shutil
 import sqlite3
 import argparse
+import importlib.util
+import string
+import time
+from bisect import bisect_right
+from contextlib import closing
 from datetime import datetime
 from pathlib import Path
+from types import ModuleType
 from typing import List, Tuple, Optional, Dict
 
 
@@ -26,6 +34,38 @@ RED = '\033[0;31m'
 BLUE = '\033[0;34m'
 NC = '\033[0m'  # No Color
 
+# Files written by the create command: migration_<version>_<name>.py
+MIGRATION_FILE_PATTERN = re.compile(r'^migration_(\d+)_\w+\.py$')
+
+# Start of each underscore-separated word in a migration name (for its class name)
+CLASS_NAME_PART_PATTERN = re.compile(r'(?:^|_)([A-Za-z0-9]?)')
+
+# Buffer size for userspace file copies when copy_file_range is unavailable
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def copy_file(src: str, dst: str):
+    """
+    Copy src over dst, letting the kernel move the bytes where possible
+    (os.copy_file_range on Linux), otherwise through a 1 MiB buffer
+    """
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        if hasattr(os, 'copy_file_range'):
+            remaining = os.fstat(fsrc.fileno()).st_size
+            try:
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                return
+            except OSError:
+                # Unsupported by this kernel/filesystem pair; start over in userspace
+                fsrc.seek(0)
+                fdst.seek(0)
+                fdst.truncate()
+        shutil.copyfileobj(fsrc, fdst, COPY_BUFFER_SIZE)
+
 
 class Migration:
     """Represents a single database migration"""
@@ -47,6 +87,9 @@ class Migration:
 class MigrationManager:
     """Manages database migrations for VoiceVerse"""
 
+    # Imported migration modules, keyed by (path, mtime)
+    _module_cache: Dict[Tuple[str, float], ModuleType] = {}
+
     def __init__(self, db_path: str = 'voiceverse.db', migrations_dir: Optional[Path] = None):
         """Initialize the migration manager"""
         self.db_path = db_path
@@ -58,6 +101,24 @@ class MigrationManager:
         self.migrations: List[Migration] = []
         self._load_migrations()
 
+        # One connection for the manager's lifetime; transactions are explicit
+        self._conn = sqlite3.connect(self.db_path, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode = WAL')
+        self._conn.execute('PRAGMA synchronous = NORMAL')
+        self._conn.execute('PRAGMA temp_store = MEMORY')
+        self._conn.execute('PRAGMA cache_size = -64000')
+        self._ensure_migrations_table(self._conn)
+
+    def close(self):
+        """Close the manager's database connection"""
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def print_success(self, message: str):
         """Print success message in green"""
         print(f"{GREEN}✓ {message}{NC}")
@@ -76,15 +137,60 @@ class MigrationManager:
 
     def _load_migrations(self):
         """Load all available migrations"""
-        # For now, we'll define migrations inline
-        # In a real system, you might load these from separate files
         self.migrations = [
             InitialSchemaMigration(),
-            # Add more migrations here as needed
+            # Add more inline migrations here as needed
         ]
+        self.migrations.extend(self._discover_migrations())
 
         # Sort migrations by version
         self.migrations.sort(key=lambda m: m.version)
+        self._versions = [m.version for m in self.migrations]
+        self.latest_version = self._versions[-1] if self._versions else 0
+
+    def _discover_migrations(self) -> List[Migration]:
+        """Instantiate the migration classes defined in migration_NNN_<name>.py files"""
+        if not self.migrations_dir.is_dir():
+            return []
+
+        # One directory read; versions come from the filenames
+        with os.scandir(self.migrations_dir) as entries:
+            files = sorted(
+                (
+                    (int(match.group(1)), entry)
+                    for entry in entries
+                    if (match := MIGRATION_FILE_PATTERN.match(entry.name)) and entry.is_file()
+                ),
+                key=lambda item: item[0]
+            )
+
+        if not files:
+            return []
+
+        # Generated files import Migration from this module by name
+        migrations_path = str(self.migrations_dir)
+        if migrations_path not in sys.path:
+            sys.path.insert(0, migrations_path)
+
+        discovered = []
+        for _, entry in files:
+            module = self._load_migration_module(entry)
+            for obj in vars(module).values():
+                if (isinstance(obj, type) and obj.__module__ == module.__name__
+                        and callable(getattr(obj, 'up', None))):
+                    discovered.append(obj())
+        return discovered
+
+    def _load_migration_module(self, entry: os.DirEntry) -> ModuleType:
+        """Import a migration file, reusing the module while the file is unchanged"""
+        key = (entry.path, entry.stat().st_mtime)
+        module = self._module_cache.get(key)
+        if module is None:
+            spec = importlib.util.spec_from_file_location(Path(entry.name).stem, entry.path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            self._module_cache[key] = module
+        return module
 
     def _ensure_migrations_table(self, conn: sqlite3.Connection):
         """Ensure the migrations tracking table exists"""
@@ -96,19 +202,14 @@ class MigrationManager:
                 description TEXT
             )
         ''')
-        conn.commit()
 
     def get_current_version(self) -> int:
         """Get the current database schema version"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            self._ensure_migrations_table(conn)
-
-            cursor = conn.execute(
+            cursor = self._conn.execute(
                 'SELECT MAX(version) FROM schema_migrations'
             )
             result = cursor.fetchone()
-            conn.close()
 
             return result[0] if result[0] is not None else 0
         except Exception as e:
@@ -118,14 +219,10 @@ class MigrationManager:
     def get_applied_migrations(self) -> List[Dict]:
         """Get list of all applied migrations"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            self._ensure_migrations_table(conn)
-
-            cursor = conn.execute(
+            cursor = self._conn.execute(
                 'SELECT version, name, applied_at, description FROM schema_migrations ORDER BY version'
             )
             results = cursor.fetchall()
-            conn.close()
 
             return [
                 {
@@ -143,24 +240,49 @@ class MigrationManager:
     def backup_database(self) -> Tuple[bool, str]:
         """
         Create a backup of the database before migration
+
+        In WAL mode the log is checkpointed and truncated first, so the
+        snapshot is taken from a fully up-to-date main file and the -wal
+        file does not keep growing between migrations.
         Returns: (success, backup_path)
         """
         if not os.path.exists(self.db_path):
             return False, "Database file does not exist"
 
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = time.strftime('%Y%m%d_%H%M%S', time.gmtime())
         backup_dir = Path(self.db_path).parent / 'backups'
         backup_dir.mkdir(exist_ok=True)
 
         backup_path = backup_dir / f"voiceverse_backup_{timestamp}.db"
 
         try:
-            import shutil
-            shutil.copy2(self.db_path, backup_path)
+            journal_mode = self._conn.execute('PRAGMA journal_mode').fetchone()[0]
+            if journal_mode.lower() != 'wal':
+                # Outside WAL mode the main file holds every committed page, and
+                # a read transaction keeps writers out while the kernel copies it
+                # (a reflink on copy-on-write filesystems)
+                self._conn.execute('BEGIN')
+                try:
+                    self._conn.execute('SELECT 1 FROM sqlite_master LIMIT 1').fetchall()
+                    copy_file(self.db_path, str(backup_path))
+                finally:
+                    self._conn.rollback()
+            else:
+                self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchall()
+
+                # Writers may still append to the -wal file; SQLite's online
+                # backup copies a consistent snapshot page by page
+                with closing(sqlite3.connect(str(backup_path))) as target:
+                    self._conn.backup(target)
             return True, str(backup_path)
         except Exception as e:
             return False, f"Backup failed: {str(e)}"
 
+    def restore_database(self, backup_path: str):
+        """Copy a backup back into the live database through the open connection"""
+        with closing(sqlite3.connect(backup_path)) as backup:
+            backup.backup(self._conn)
+
     def apply_migration(self, migration: Migration) -> Tuple[bool, str]:
         """
         Apply a single migration
@@ -171,9 +293,9 @@ class MigrationManager:
         if not backup_success:
             return False, f"Backup failed: {backup_path}"
 
+        conn = self._conn
         try:
-            conn = sqlite3.connect(self.db_path)
-            self._ensure_migrations_table(conn)
+            conn.execute('BEGIN')
 
             # Apply the migration
             migration.up(conn)
@@ -185,22 +307,74 @@ class MigrationManager:
             ''', (
                 migration.version,
                 migration.name,
-                datetime.utcnow().isoformat() + 'Z',
+                time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
                 migration.description
             ))
 
             conn.commit()
-            conn.close()
 
             return True, f"Migration {migration.version} applied successfully (backup: {backup_path})"
         except Exception as e:
+            conn.rollback()
+
+            # Restore from backup on failure
+            self.print_error(f"Migration failed: {str(e)}")
+            self.print_warning(f"Restoring from backup: {backup_path}")
+
+            try:
+                self.restore_database(backup_path)
+                return False, f"Migration failed and database restored from backup: {str(e)}"
+            except Exception as restore_error:
+                return False, f"Migration failed AND restore failed: {str(e)} / {str(restore_error)}"
+
+    def upgrade_batch(self, migrations: List[Migration]) -> Tuple[bool, str]:
+        """
+        Apply several migrations in one transaction, behind a single backup
+        Returns: (success, message)
+        """
+        backup_success, backup_path = self.backup_database()
+        if not backup_success:
+            return False, f"Backup failed: {backup_path}"
+
+        conn = self._conn
+        try:
+            conn.execute('BEGIN')
+
+            for migration in migrations:
+                self.print_info(f"Applying migration {migration.version}: {migration.name}")
+                migration.up(conn)
+
+                # A commit() (or executescript()) inside up() ends the batch
+                # transaction early, so later failures could not roll it back
+                if not conn.in_transaction:
+                    raise RuntimeError(
+                        f"Migration {migration.version} ({migration.name}) ended the "
+                        "manager's transaction; migrations must not call commit()"
+                    )
+
+            # Record all migrations at once
+            applied_at = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            conn.executemany('''
+                INSERT INTO schema_migrations (version, name, applied_at, description)
+                VALUES (?, ?, ?, ?)
+            ''', [
+                (migration.version, migration.name, applied_at, migration.description)
+                for migration in migrations
+            ])
+
+            conn.commit()
+
+            versions = ', '.join(str(migration.version) for migration in migrations)
+            return True, f"Migrations {versions} applied successfully (backup: {backup_path})"
+        except Exception as e:
+            conn.rollback()
+
             # Restore from backup on failure
             self.print_error(f"Migration failed: {str(e)}")
             self.print_warning(f"Restoring from backup: {backup_path}")
 
             try:
-                import shutil
-                shutil.copy2(backup_path, self.db_path)
+                self.restore_database(backup_path)
                 return False, f"Migration failed and database restored from backup: {str(e)}"
             except Exception as restore_error:
                 return False, f"Migration failed AND restore failed: {str(e)} / {str(restore_error)}"
@@ -215,8 +389,9 @@ class MigrationManager:
         if not backup_success:
             return False, f"Backup failed: {backup_path}"
 
+        conn = self._conn
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn.execute('BEGIN')
 
             # Revert the migration
             migration.down(conn)
@@ -228,10 +403,10 @@ class MigrationManager:
             )
 
             conn.commit()
-            conn.close()
 
             return True, f"Migration {migration.version} reverted successfully (backup: {backup_path})"
         except Exception as e:
+            conn.rollback()
             return False, f"Revert failed: {str(e)}"
 
     def upgrade(self, target_version: Optional[int] = None) -> int:
@@ -242,15 +417,14 @@ class MigrationManager:
         current_version = self.get_current_version()
 
         if target_version is None:
-            target_version = max([m.version for m in self.migrations]) if self.migrations else 0
+            target_version = self.latest_version
 
         if current_version >= target_version:
             self.print_info(f"Database already at version {current_version}")
             return 0
 
-        migrations_to_apply = [
-            m for m in self.migrations
-            if current_version < m.version <= target_version
+        migrations_to_apply = self.migrations[
+            bisect_right(self._versions, current_version):bisect_right(self._versions, target_version)
         ]
 
         if not migrations_to_apply:
@@ -259,19 +433,13 @@ class MigrationManager:
 
         self.print_info(f"Applying {len(migrations_to_apply)} migration(s)...")
 
-        applied_count = 0
-        for migration in migrations_to_apply:
-            self.print_info(f"Applying migration {migration.version}: {migration.name}")
-            success, message = self.apply_migration(migration)
-
-            if success:
-                self.print_success(message)
-                applied_count += 1
-            else:
-                self.print_error(message)
-                break
+        success, message = self.upgrade_batch(migrations_to_apply)
+        if not success:
+            self.print_error(message)
+            return 0
 
-        return applied_count
+        self.print_success(message)
+        return len(migrations_to_apply)
 
     def downgrade(self, steps: int = 1) -> int:
         """
@@ -314,34 +482,39 @@ class MigrationManager:
         current_version = self.get_current_version()
         applied_migrations = self.get_applied_migrations()
 
-        print("\n" + "=" * 60)
-        print("Database Migration Status")
-        print("=" * 60 + "\n")
+        # Collected and written to stdout once rather than one print() per line
+        lines = []
+
+        lines.append("\n" + "=" * 60)
+        lines.append("Database Migration Status")
+        lines.append("=" * 60 + "\n")
 
-        print(f"Database: {self.db_path}")
-        print(f"Current Version: {current_version}")
-        print(f"Latest Available Version: {max([m.version for m in self.migrations]) if self.migrations else 0}")
+        lines.append(f"Database: {self.db_path}")
+        lines.append(f"Current Version: {current_version}")
+        lines.append(f"Latest Available Version: {self.latest_version}")
 
         if applied_migrations:
-            print(f"\nApplied Migrations ({len(applied_migrations)}):")
-            print("-" * 60)
+            lines.append(f"\nApplied Migrations ({len(applied_migrations)}):")
+            lines.append("-" * 60)
             for mig in applied_migrations:
-                print(f"  v{mig['version']}: {mig['name']}")
-                print(f"      Applied: {mig['applied_at']}")
+                lines.append(f"  v{mig['version']}: {mig['name']}")
+                lines.append(f"      Applied: {mig['applied_at']}")
                 if mig['description']:
-                    print(f"      {mig['description']}")
+                    lines.append(f"      {mig['description']}")
         else:
-            print("\nNo migrations have been applied yet.")
+            lines.append("\nNo migrations have been applied yet.")
 
-        pending_migrations = [m for m in self.migrations if m.version > current_version]
+        pending_migrations = self.migrations[bisect_right(self._versions, current_version):]
         if pending_migrations:
-            print(f"\nPending Migrations ({len(pending_migrations)}):")
-            print("-" * 60)
+            lines.append(f"\nPending Migrations ({len(pending_migrations)}):")
+            lines.append("-" * 60)
             for mig in pending_migrations:
-                print(f"  v{mig.version}: {mig.name}")
-                print(f"      {mig.description}")
+                lines.append(f"  v{mig.version}: {mig.name}")
+                lines.append(f"      {mig.description}")
 
-        print("\n" + "=" * 60 + "\n")
+        lines.append("\n" + "=" * 60 + "\n")
+
+        sys.stdout.write('\n'.join(lines) + '\n')
 
 
 # Migration Definitions
@@ -366,6 +539,59 @@ class InitialSchemaMigration(Migration):
         raise Exception("Cannot downgrade from initial schema")
 
 
+# Skeleton written by the create command
+MIGRATION_TEMPLATE = string.Template('''\
+"""
+Migration: ${name}
+Version: ${version}
+Created: ${created}
+"""
+
+from migration_manager import Migration
+import sqlite3
+
+
+class ${class_name}Migration(Migration):
+    """TODO: Add migration description"""
+
+    def __init__(self):
+        super().__init__(
+            version=${version},
+            name="${name}",
+            description="TODO: Add description"
+        )
+
+    def up(self, conn: sqlite3.Connection):
+        """
+        Apply the migration
+
+        Runs inside the migration manager's transaction, which commits or
+        rolls back all pending migrations together: do not call
+        conn.commit() or conn.executescript() here.
+        """
+        # TODO: Add migration code here
+        # Example:
+        # conn.execute("""
+        #     ALTER TABLE users ADD COLUMN new_column TEXT
+        # """)
+        pass
+
+    def down(self, conn: sqlite3.Connection):
+        """
+        Revert the migration
+
+        Runs inside the migration manager's transaction: do not call
+        conn.commit() or conn.executescript() here.
+        """
+        # TODO: Add rollback code here
+        # Example:
+        # conn.execute("""
+        #     ALTER TABLE users DROP COLUMN new_column
+        # """)
+        pass
+''')
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='VoiceVerse Database Migration Manager',
@@ -418,8 +644,12 @@ Examples:
     args = parser.parse_args()
 
     # Initialize manager
-    manager = MigrationManager(db_path=args.db)
+    with MigrationManager(db_path=args.db) as manager:
+        return run_command(manager, args)
 
+
+def run_command(manager: MigrationManager, args: argparse.Namespace) -> int:
+    """Execute a parsed CLI command"""
     if args.command == 'status':
         manager.status()
         return 0
@@ -443,57 +673,21 @@ Examples:
 
         # Get next version number
         current_version = manager.get_current_version()
-        next_version = max([m.version for m in manager.migrations]) + 1 if manager.migrations else 1
-
-        template = f'''
-"""
-Migration: {args.name}
-Version: {next_version}
-Created: {datetime.now().isoformat()}
-"""
-
-from migration_manager import Migration
-import sqlite3
-
-
-class {args.name.title().replace('_', '')}Migration(Migration):
-    """TODO: Add migration description"""
+        next_version = manager.latest_version + 1
 
-    def __init__(self):
-        super().__init__(
-            version={next_version},
-            name="{args.name}",
-            description="TODO: Add description"
+        text = MIGRATION_TEMPLATE.substitute(
+            name=args.name,
+            version=next_version,
+            created=datetime.now().isoformat(),
+            class_name=CLASS_NAME_PART_PATTERN.sub(lambda m: m.group(1).upper(), args.name)
         )
 
-    def up(self, conn: sqlite3.Connection):
-        """Apply the migration"""
-        # TODO: Add migration code here
-        # Example:
-        # conn.execute("""
-        #     ALTER TABLE users ADD COLUMN new_column TEXT
-        # """)
-        # conn.commit()
-        pass
-
-    def down(self, conn: sqlite3.Connection):
-        """Revert the migration"""
-        # TODO: Add rollback code here
-        # Example:
-        # conn.execute("""
-        #     ALTER TABLE users DROP COLUMN new_column
-        # """)
-        # conn.commit()
-        pass
-'''
-
         migration_file = manager.migrations_dir / f"migration_{next_version:03d}_{args.name}.py"
 
-        with open(migration_file, 'w') as f:
-            f.write(template.strip() + '\n')
+        migration_file.write_text(text)
 
         manager.print_success(f"Created migration file: {migration_file}")
-        manager.print_info(f"Edit the file and add it to migration_manager.py's _load_migrations() method")
+        manager.print_info("Edit the file; it is loaded automatically from the migrations directory")
         return 0
 
     return 0
@@ -12,10 +12,88 @@ INSTALLATION:
 
 """
 
-from flask import send_from_directory, jsonify, request
+from flask import Response, send_from_directory, jsonify, request
 from flask_cors import CORS
+import hashlib
+import json
 import os
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Offline fallback page, encoded once and served with a fixed ETag
+OFFLINE_HTML = b"""
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Offline - VoiceVerse</title>
+    <style>
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+            background-color: #191414;
+            color: #ffffff;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            min-height: 100vh;
+            margin: 0;
+            padding: 20px;
+            text-align: center;
+        }
+        .offline-container {
+            max-width: 400px;
+        }
+        h1 {
+            color: #1DB954;
+            margin-bottom: 1rem;
+        }
+        p {
+            color: #b3b3b3;
+            line-height: 1.6;
+        }
+        button {
+            background-color: #1DB954;
+            color: #191414;
+            border: none;
+            padding: 12px 24px;
+            border-radius: 24px;
+            font-weight: 700;
+            cursor: pointer;
+            margin-top: 1rem;
+        }
+    </style>
+</head>
+<body>
+    <div class="offline-container">
+        <h1>You're Offline</h1>
+        <p>It looks like you've lost your internet connection. Check your connection and try again.</p>
+        <button onclick="window.location.reload()">Try Again</button>
+    </div>
+</body>
+</html>
+"""
+OFFLINE_ETAG = hashlib.md5(OFFLINE_HTML).hexdigest()
+
+# Hosts that are served over plain HTTP during development
+LOCAL_HOSTS = frozenset({'localhost', '127.0.0.1', '[::1]', '0.0.0.0'})
+
+# Existing security headers (keep your current ones), added to every response
+SECURITY_HEADERS = {
+    'X-Content-Type-Options': 'nosniff',
+    'X-Frame-Options': 'DENY',
+    'X-XSS-Protection': '1; mode=block'
+}
+
+# Static assets additionally get a one-year cache lifetime
+STATIC_HEADERS = {**SECURITY_HEADERS, 'Cache-Control': 'public, max-age=31536000'}
+
+# Pre-built body for accepted analytics beacons
+ANALYTICS_OK_RESPONSE = (b'{"success": true}', 200, {'Content-Type': 'application/json'})
+
 # ==================== CORS SETUP ====================
 # Add this near the top of tts_app19.py, after creating the Flask app
 
@@ -50,78 +128,33 @@ def add_pwa_routes(app):
 
     @app.route('/service-worker.js')
     def service_worker():
-        """Serve service worker with correct MIME type and no-cache headers"""
-        response = send_from_directory('mobile-app/pwa', 'service-worker.js', mimetype='application/javascript')
+        """Serve service worker with correct MIME type, revalidated on every fetch"""
+        # max_age=0 makes browsers revalidate; unchanged files get a 304 via the ETag
+        response = send_from_directory(
+            'mobile-app/pwa', 'service-worker.js',
+            mimetype='application/javascript', max_age=0, conditional=True
+        )
         response.headers['Service-Worker-Allowed'] = '/'
-        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-        response.headers['Pragma'] = 'no-cache'
-        response.headers['Expires'] = '0'
         return response
 
     @app.route('/offline')
     def offline():
         """Offline fallback page"""
-        return """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Offline - VoiceVerse</title>
-            <style>
-                body {
-                    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-                    background-color: #191414;
-                    color: #ffffff;
-                    display: flex;
-                    align-items: center;
-                    justify-content: center;
-                    min-height: 100vh;
-                    margin: 0;
-                    padding: 20px;
-                    text-align: center;
-                }
-                .offline-container {
-                    max-width: 400px;
-                }
-                h1 {
-                    color: #1DB954;
-                    margin-bottom: 1rem;
-                }
-                p {
-                    color: #b3b3b3;
-                    line-height: 1.6;
-                }
-                button {
-                    background-color: #1DB954;
-                    color: #191414;
-                    border: none;
-                    padding: 12px 24px;
-                    border-radius: 24px;
-                    font-weight: 700;
-                    cursor: pointer;
-                    margin-top: 1rem;
-                }
-            </style>
-        </head>
-        <body>
-            <div class="offline-container">
-                <h1>You're Offline</h1>
-                <p>It looks like you've lost your internet connection. Check your connection and try again.</p>
-                <button onclick="window.location.reload()">Try Again</button>
-            </div>
-        </body>
-        </html>
-        """
+        response = Response(OFFLINE_HTML, mimetype='text/html')
+        response.headers['Cache-Control'] = 'public, max-age=3600'
+        response.set_etag(OFFLINE_ETAG)
+        return response.make_conditional(request)
 
-    @app.route('/api/analytics/event', methods=['POST'])
+    @app.route('/api/analytics/event', methods=['POST'], strict_slashes=False)
     def analytics_event():
         """
         Handle PWA analytics events
         Optional: integrate with your analytics system
         """
         try:
-            data = request.get_json()
+            # Beacons are read once; skip Werkzeug's body and JSON caching
+            body = request.get_data(cache=False)
+            data = orjson.loads(body) if orjson is not None else json.loads(body)
             event_name = data.get('event')
             event_data = data.get('data', {})
             timestamp = data.get('timestamp')
@@ -131,7 +164,7 @@ def add_pwa_routes(app):
 
             # You can store in database, send to Google Analytics, etc.
 
-            return jsonify({'success': True}), 200
+            return ANALYTICS_OK_RESPONSE
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -169,22 +202,22 @@ def add_pwa_headers(app):
 
     @app.after_request
     def add_security_headers(response):
-        # Existing security headers (keep your current ones)
-        response.headers['X-Content-Type-Options'] = 'nosniff'
-        response.headers['X-Frame-Options'] = 'DENY'
-        response.headers['X-XSS-Protection'] = '1; mode=block'
+        path = request.path
+
+        # Cache control for static assets
+        if path.startswith('/static/'):
+            response.headers.update(STATIC_HEADERS)
+            return response
+
+        response.headers.update(SECURITY_HEADERS)
 
         # PWA-specific headers
         # Allow service worker to control all pages
-        if request.path == '/service-worker.js':
+        if path == '/service-worker.js':
             response.headers['Service-Worker-Allowed'] = '/'
 
-        # Cache control for static assets
-        if '/static/' in request.path:
-            response.headers['Cache-Control'] = 'public, max-age=31536000'  # 1 year
-
-        # No cache for HTML pages
-        if response.content_type == 'text/html':
+        # No cache for HTML pages, unless the route chose its own policy
+        elif response.mimetype == 'text/html' and 'Cache-Control' not in response.headers:
             response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
 
         return response
@@ -205,8 +238,11 @@ def force_https(app):
 
     @app.before_request
     def redirect_to_https():
-        # Skip redirect for localhost
-        if request.host.startswith('localhost') or request.host.startswith('127.0.0.1'):
+        # Skip redirect for localhost (compare the host without its port)
+        host = request.host
+        if not host.endswith(']'):
+            host = host.rsplit(':', 1)[0]
+        if host in LOCAL_HOSTS:
             return None
 
         # Skip if already HTTPS
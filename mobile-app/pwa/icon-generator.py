@@ -4,28 +4,61 @@ PWA Icon Generator
 Generates all required icon sizes for Progressive Web App
 
 Requirements:
-    pip3 install Pillow
+    pip3 install -r requirements.txt
+
+    (installs NumPy, plus Pillow-SIMD on x86_64, a drop-in Pillow build
+    with vectorized resampling, and stock Pillow elsewhere)
+
+    Optional: pip3 install opencv-python-headless
+    (resizes through OpenCV's faster Lanczos filter when available)
 
 Usage:
     python3 icon-generator.py path/to/source-icon.png
 """
 
+import io
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 try:
-    from PIL import Image, ImageDraw, ImageFont
+    import numpy as np
+    import PIL
+    from PIL import Image, ImageFont
 except ImportError:
-    print("Error: Pillow is required. Install with: pip3 install Pillow")
+    print("Error: Pillow and NumPy are required. Install with: pip3 install -r requirements.txt")
     sys.exit(1)
 
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
 
 # Icon sizes required for PWA
 ICON_SIZES = [
     16, 32, 72, 96, 120, 128, 144, 152, 180, 192, 384, 512
 ]
 
+# Default icon colors (#1DB954, #191414)
+BRAND_GREEN = (29, 185, 84)
+BRAND_DARK = (25, 20, 20)
+
+# zlib level for PNG output: lossless at any level, and level 1 encodes far
+# faster than the default 6 for slightly larger files
+PNG_COMPRESS_LEVEL = 1
+
+# Downscales by more than this factor start with a cheap Image.reduce()
+# box pass before the final LANCZOS filter
+RESIZE_REDUCING_GAP = 2.0
+
+# Every icon size used below (ICON_SIZES plus the 64px favicon layer),
+# largest first: the order generate_icons() resizes them in. Each step
+# down this chain shrinks by at most 2x.
+ALL_ICON_SIZES = tuple(sorted(set(ICON_SIZES) | {64}, reverse=True))
+
 # Splash screen sizes for iOS
 SPLASH_SIZES = [
     (640, 1136, 'iphone5'),      # iPhone 5/SE
@@ -41,19 +74,28 @@ SPLASH_SIZES = [
 ]
 
 
+# Decoded RGBA source images, keyed by path
+_source_images = {}
+
+
+@lru_cache(maxsize=None)
 def create_default_icon(size):
-    """Create a default VoiceVerse icon if no source provided"""
-    img = Image.new('RGB', (size, size), color='#1DB954')
-    draw = ImageDraw.Draw(img)
+    """
+    Create a default VoiceVerse icon if no source provided
+
+    Results are memoized, so the returned Image is shared: callers must
+    .copy() it before drawing on or pasting into it.
+    """
+    # Green background, filled as one array
+    img = np.empty((size, size, 3), dtype=np.uint8)
+    img[:] = BRAND_GREEN
 
-    # Draw circle background
+    # Dark circle inside a green ring of width size // 40
     margin = size // 10
-    draw.ellipse(
-        [margin, margin, size - margin, size - margin],
-        fill='#191414',
-        outline='#1DB954',
-        width=size // 40
-    )
+    radius = (size - 2 * margin) / 2 - size // 40
+    center = size / 2
+    yy, xx = np.ogrid[:size, :size]
+    img[(xx - center) ** 2 + (yy - center) ** 2 <= radius * radius] = BRAND_DARK
 
     # Draw sound wave symbol
     center_x = size // 2
@@ -69,35 +111,85 @@ def create_default_icon(size):
     ]
 
     for x, height in bar_positions:
-        top = center_y - height // 2
-        bottom = center_y + height // 2
-        draw.rectangle(
-            [x - wave_width // 2, top, x + wave_width // 2, bottom],
-            fill='#1DB954'
-        )
+        top = int(center_y - height // 2)
+        bottom = int(center_y + height // 2)
+        img[top:bottom + 1, x - wave_width // 2:x + wave_width // 2 + 1] = BRAND_GREEN
+
+    return Image.fromarray(img)
 
-    return img
 
+def load_source_image(source_path):
+    """
+    Load the source icon converted to RGBA (None if it cannot be read)
+
+    Decoded images are cached per process, and splash workers forked after
+    main() has loaded the source inherit the cache.
+    """
+    if source_path in _source_images:
+        return _source_images[source_path]
 
-def generate_icon(source_path, size):
-    """Generate icon of specific size"""
     try:
-        # Load source image
         img = Image.open(source_path)
 
         # Convert to RGBA if necessary
         if img.mode != 'RGBA':
             img = img.convert('RGBA')
 
-        # Resize with high-quality resampling
-        img_resized = img.resize((size, size), Image.Resampling.LANCZOS)
-
-        return img_resized
-
     except Exception as e:
         print(f"Warning: Could not load source image: {e}")
-        print(f"Generating default icon for size {size}x{size}")
-        return create_default_icon(size)
+        print("Generating default icons instead")
+        img = None
+
+    _source_images[source_path] = img
+    return img
+
+
+def resize_lanczos(img, size):
+    """
+    Resize to a size x size square with high-quality LANCZOS resampling,
+    box-reducing large ratios first
+
+    Uses OpenCV's faster INTER_LANCZOS4 for the final filter when cv2 is
+    installed, and Pillow otherwise.
+    """
+    if cv2 is None or img.mode not in ('RGB', 'RGBA'):
+        return img.resize(
+            (size, size), Image.Resampling.LANCZOS, reducing_gap=RESIZE_REDUCING_GAP
+        )
+
+    # cv2's Lanczos kernel does not widen when downscaling, so bring large
+    # ratios within RESIZE_REDUCING_GAP with Pillow's box reduce first
+    factor = int(min(img.size) / size / RESIZE_REDUCING_GAP)
+    if factor > 1:
+        img = img.reduce(factor)
+
+    # Resample RGBA premultiplied (as Pillow does) so transparent pixels do
+    # not bleed their color into the edges
+    mode = 'RGBa' if img.mode == 'RGBA' else img.mode
+    arr = np.asarray(img.convert(mode) if mode != img.mode else img)
+    out = cv2.resize(arr, (size, size), interpolation=cv2.INTER_LANCZOS4)
+    resized = Image.frombytes(mode, (size, size), out.tobytes())
+    return resized.convert('RGBA') if mode == 'RGBa' else resized
+
+
+def generate_icon(source_image, size):
+    """Generate icon of specific size from an already loaded source image"""
+    return resize_lanczos(source_image, size)
+
+
+def generate_icons(source_image, sizes=ALL_ICON_SIZES):
+    """
+    Generate icons for all sizes, each resized from the previous (larger)
+    icon instead of from the full-resolution source
+
+    sizes must be unique and in descending order, like ALL_ICON_SIZES.
+    """
+    icons = {}
+    previous = source_image
+    for size in sizes:
+        previous = generate_icon(previous, size)
+        icons[size] = previous
+    return icons
 
 
 def generate_splash(source_path, width, height, device_name):
@@ -107,21 +199,25 @@ def generate_splash(source_path, width, height, device_name):
         splash = Image.new('RGB', (width, height), color='#191414')
 
         # Load and resize icon
-        if os.path.exists(source_path):
-            icon = Image.open(source_path)
-            if icon.mode != 'RGBA':
-                icon = icon.convert('RGBA')
-        else:
+        icon = load_source_image(source_path) if os.path.exists(source_path) else None
+        if icon is None:
+            # Memoized; main() renders the 512px icon before the splash
+            # workers fork, so they reuse it. resize() leaves it untouched.
             icon = create_default_icon(512)
 
         # Icon size: 20% of screen width
         icon_size = int(min(width, height) * 0.2)
-        icon_resized = icon.resize((icon_size, icon_size), Image.Resampling.LANCZOS)
+        icon_resized = resize_lanczos(icon, icon_size)
 
         # Center icon
         x = (width - icon_size) // 2
         y = (height - icon_size) // 2
 
+        # Fully opaque icons need no alpha blend: drop the alpha band and
+        # paste them as a straight copy
+        if icon_resized.mode == 'RGBA' and icon_resized.getextrema()[3] == (255, 255):
+            icon_resized = icon_resized.convert('RGB')
+
         # Paste icon (handle transparency)
         if icon_resized.mode == 'RGBA':
             splash.paste(icon_resized, (x, y), icon_resized)
@@ -135,15 +231,61 @@ def generate_splash(source_path, width, height, device_name):
         return None
 
 
-def generate_favicon(source_path):
+def encode_image(img, format='PNG', **params):
+    """Encode an image in memory (PNGs at PNG_COMPRESS_LEVEL by default)"""
+    if format == 'PNG':
+        params.setdefault('compress_level', PNG_COMPRESS_LEVEL)
+    buf = io.BytesIO()
+    img.save(buf, format, **params)
+    return buf.getvalue()
+
+
+def write_file(path, data):
+    """Write encoded bytes with a single open/write/close"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def save_image(img, path, format='PNG', **params):
+    """Encode an image in memory and write it out in one go"""
+    write_file(path, encode_image(img, format, **params))
+
+
+def fsync_dir(path):
+    """Flush a directory's entries to disk (no-op where unsupported)"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def save_splash(job):
+    """Render and save one splash screen (runs in a worker process)"""
+    source_path, width, height, device_name, output_path = job
+    splash = generate_splash(source_path, width, height, device_name)
+    if splash:
+        save_image(splash, output_path)
+
+
+def generate_favicon(icons):
     """Generate multi-size favicon.ico"""
     try:
         sizes = [16, 32, 64]
         images = []
 
         for size in sizes:
-            img = generate_icon(source_path, size)
-            images.append(img)
+            images.append(icons[size])
 
         return images
 
@@ -153,6 +295,10 @@ def generate_favicon(source_path):
 
 
 def main():
+    # Pillow-SIMD releases are versioned as X.Y.Z.postN
+    if 'post' not in PIL.__version__:
+        print("Tip: install Pillow-SIMD (see requirements.txt) for faster resizing")
+
     # Get source icon path
     if len(sys.argv) > 1:
         source_path = sys.argv[1]
@@ -172,40 +318,32 @@ def main():
 
     print("Generating PWA icons...")
 
+    # Decode the source once and resize every icon size from it
+    source_image = load_source_image(source_path) if source_path else None
+    if source_image is not None:
+        icons = generate_icons(source_image)
+    else:
+        icons = {size: create_default_icon(size) for size in ALL_ICON_SIZES}
+
     # Generate standard icons
     for size in ICON_SIZES:
         print(f"  Creating {size}x{size} icon...")
-        if source_path:
-            icon = generate_icon(source_path, size)
-        else:
-            icon = create_default_icon(size)
-
-        icon.save(icons_dir / f'icon-{size}x{size}.png', 'PNG')
+        save_image(icons[size], icons_dir / f'icon-{size}x{size}.png')
 
     # Generate Apple Touch Icon (special case)
     print("  Creating 180x180 Apple Touch Icon...")
-    if source_path:
-        apple_icon = generate_icon(source_path, 180)
-    else:
-        apple_icon = create_default_icon(180)
-    apple_icon.save(icons_dir / 'apple-touch-icon.png', 'PNG')
+    save_image(icons[180], icons_dir / 'apple-touch-icon.png')
 
     # Generate favicons
     print("  Creating favicons...")
-    if source_path:
-        favicon_16 = generate_icon(source_path, 16)
-        favicon_32 = generate_icon(source_path, 32)
-    else:
-        favicon_16 = create_default_icon(16)
-        favicon_32 = create_default_icon(32)
-
-    favicon_16.save(icons_dir / 'favicon-16x16.png', 'PNG')
-    favicon_32.save(icons_dir / 'favicon-32x32.png', 'PNG')
+    save_image(icons[16], icons_dir / 'favicon-16x16.png')
+    save_image(icons[32], icons_dir / 'favicon-32x32.png')
 
     # Generate multi-size .ico file
-    favicon_images = generate_favicon(source_path or '')
+    favicon_images = generate_favicon(icons)
     if favicon_images:
-        favicon_images[0].save(
+        save_image(
+            favicon_images[0],
             icons_dir / 'favicon.ico',
             format='ICO',
             sizes=[(16, 16), (32, 32), (64, 64)]
@@ -213,28 +351,30 @@ def main():
 
     # Generate badge icon (smaller, simplified)
     print("  Creating badge icon...")
-    if source_path:
-        badge = generate_icon(source_path, 72)
-    else:
-        badge = create_default_icon(72)
-    badge.save(icons_dir / 'badge-72x72.png', 'PNG')
+    save_image(icons[72], icons_dir / 'badge-72x72.png')
 
     # Generate shortcut icons
     print("  Creating shortcut icons...")
-    if source_path:
-        shortcut = generate_icon(source_path, 96)
-    else:
-        shortcut = create_default_icon(96)
-    shortcut.save(icons_dir / 'shortcut-generate.png', 'PNG')
-    shortcut.save(icons_dir / 'shortcut-library.png', 'PNG')
+    shortcut = encode_image(icons[96])
+    write_file(icons_dir / 'shortcut-generate.png', shortcut)
+    write_file(icons_dir / 'shortcut-library.png', shortcut)
 
     # Generate iOS splash screens
     print("\nGenerating iOS splash screens...")
+    splash_jobs = []
     for width, height, device_name in SPLASH_SIZES:
         print(f"  Creating {device_name} splash ({width}x{height})...")
-        splash = generate_splash(source_path or '', width, height, device_name)
-        if splash:
-            splash.save(splash_dir / f'{device_name}_splash.png', 'PNG')
+        splash_jobs.append(
+            (source_path or '', width, height, device_name, splash_dir / f'{device_name}_splash.png')
+        )
+
+    # Splash screens are independent; render and encode them on all cores
+    with ProcessPoolExecutor() as executor:
+        list(executor.map(save_splash, splash_jobs))
+
+    # Make the new directory entries durable with one fsync per directory
+    fsync_dir(icons_dir)
+    fsync_dir(splash_dir)
 
     print("\n✓ Icon generation complete!")
     print(f"\nIcons saved to: {icons_dir.absolute()}")
@@ -22,15 +22,114 @@ Usage:
 import os
 import json
 import smtplib
+import string
+import threading
 import time
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from itertools import islice
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Callable
+from typing import Dict, List, Optional, Callable, Tuple
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from monitoring.metrics_collector import get_metrics_collector
 from monitoring.log_analyzer import LogAnalyzer
 from pathlib import Path
 
+try:
+    import requests
+except ImportError:
+    requests = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Number of triggered alerts kept in memory
+ALERT_HISTORY_LIMIT = 1000
+
+
+def _tts_failure_rate(metrics_data: Dict) -> float:
+    """Percentage of failed TTS requests"""
+    total = metrics_data['tts']['total']
+    failures = metrics_data['tts']['failure']
+    return (failures / total * 100) if total > 0 else 0
+
+
+# Seconds a security log analysis is reused before the logs are re-read
+SECURITY_ANALYSIS_TTL_SECONDS = 60
+
+# Metric name -> extractor(metrics_data, alerting_system), built once at import
+METRIC_EXTRACTORS: Dict[str, Callable[[Dict, 'AlertingSystem'], float]] = {
+    # System metrics
+    'cpu_percent': lambda d, a: d['system']['cpu_percent'],
+    'memory_percent': lambda d, a: d['system']['memory_percent'],
+    'disk_percent': lambda d, a: d['system']['disk_percent'],
+    # Error metrics
+    'error_rate_per_hour': lambda d, a: d['errors']['last_hour'],
+    # TTS metrics
+    'tts_failure_rate': lambda d, a: _tts_failure_rate(d),
+    # User metrics
+    'failed_logins': lambda d, a: d['users']['failed_logins'],
+    # Security metrics (from log analyzer)
+    'brute_force_attempts': lambda d, a: len(
+        a.get_security_analysis().get('brute_force_attempts', [])
+    ),
+}
+
+
+# Alert email pieces, built once. The head uses string.Template ($count)
+# because the inline CSS is full of braces.
+_EMAIL_HEAD = string.Template('''
+<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+        .header { background: #667eea; color: white; padding: 20px; border-radius: 5px; }
+        .alert-box { margin: 15px 0; padding: 15px; border-left: 4px solid; border-radius: 5px; }
+        .critical { background: #fee; border-color: #dc3545; }
+        .warning { background: #fff4e5; border-color: #ffc107; }
+        .info { background: #e7f3ff; border-color: #17a2b8; }
+        .metric { font-weight: bold; font-size: 18px; }
+        .details { color: #666; font-size: 14px; margin-top: 5px; }
+        .footer { margin-top: 30px; padding-top: 20px; border-top: 1px solid #ddd; color: #666; font-size: 12px; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h2>🚨 VoiceVerse Alert</h2>
+            <p>Detected $count issue(s)</p>
+        </div>
+        ''')
+
+_ALERT_ROW_TEMPLATE = '''
+        <div class="alert-box {severity}">
+            <div class="metric">{description}</div>
+            <div class="details">
+                Current value: {current_value:.2f} {operator} {threshold}<br>
+                Severity: {severity_label}<br>
+                Time: {timestamp}
+            </div>
+        </div>
+            '''
+
+_EMAIL_TAIL = '''
+        <div class="footer">
+            <p>This is an automated alert from VoiceVerse monitoring system.</p>
+            <p>Please review the metrics dashboard for more details.</p>
+        </div>
+    </div>
+</body>
+</html>
+        '''
+
+_SLACK_ROW_TEMPLATE = "{emoji} *{description}*\n   Current: {current_value:.2f} | Threshold: {threshold}\n"
+
 
 class AlertRule:
     """Represents an alert rule"""
@@ -52,14 +151,13 @@ class AlertRule:
         self.severity = severity
         self.description = description or f"{metric} {operator} {threshold}"
         self.cooldown_minutes = cooldown_minutes
-        self.last_triggered = None
+        self.last_triggered: Optional[float] = None
 
     def check(self, value: float) -> bool:
         """Check if the rule is triggered"""
-        # Check cooldown
-        if self.last_triggered:
-            time_since = datetime.now() - self.last_triggered
-            if time_since.total_seconds() < (self.cooldown_minutes * 60):
+        # Check cooldown (monotonic, immune to wall-clock changes)
+        if self.last_triggered is not None:
+            if time.monotonic() - self.last_triggered < self.cooldown_minutes * 60:
                 return False
 
         # Evaluate condition
@@ -78,7 +176,7 @@ class AlertRule:
 
     def trigger(self):
         """Mark rule as triggered"""
-        self.last_triggered = datetime.now()
+        self.last_triggered = time.monotonic()
 
 
 class AlertingSystem:
@@ -86,9 +184,15 @@ class AlertingSystem:
 
     def __init__(self, config_file: Optional[str] = None):
         self.rules: Dict[str, AlertRule] = {}
-        self.alert_history: List[Dict] = []
+        self.alert_history: deque = deque(maxlen=ALERT_HISTORY_LIMIT)
+        # Trigger time of each alert in alert_history, kept in step with it
+        self._alert_times: deque = deque(maxlen=ALERT_HISTORY_LIMIT)
         self.config_file = config_file or 'monitoring/alert_config.json'
 
+        # Security log analysis, cached as (monotonic time, result)
+        self._log_analyzer = LogAnalyzer()
+        self._security_analysis: Tuple[float, Optional[Dict]] = (0.0, None)
+
         # Email configuration
         self.smtp_host = os.getenv('SMTP_HOST', 'smtp.gmail.com')
         self.smtp_port = int(os.getenv('SMTP_PORT', '587'))
@@ -99,6 +203,16 @@ class AlertingSystem:
         # Slack webhook (optional)
         self.slack_webhook = os.getenv('SLACK_WEBHOOK_URL', '')
 
+        # Notification transports, kept open across alert batches
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._http = requests.Session() if requests is not None else None
+        self._smtp_lock = threading.Lock()
+
+        # Email/Slack delivery runs off the monitoring loop
+        self._notify_pool = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix='alert-notify'
+        )
+
         # Load default rules
         self._load_default_rules()
 
@@ -227,51 +341,62 @@ class AlertingSystem:
         if name in self.rules:
             del self.rules[name]
 
-    def get_metric_value(self, metric_name: str) -> Optional[float]:
-        """Get current value of a metric"""
-        try:
-            metrics = get_metrics_collector()
-            metrics_data = metrics.export_json()
-
-            # System metrics
-            if metric_name == 'cpu_percent':
-                return metrics_data['system']['cpu_percent']
-            elif metric_name == 'memory_percent':
-                return metrics_data['system']['memory_percent']
-            elif metric_name == 'disk_percent':
-                return metrics_data['system']['disk_percent']
-
-            # Error metrics
-            elif metric_name == 'error_rate_per_hour':
-                return metrics_data['errors']['last_hour']
-
-            # TTS metrics
-            elif metric_name == 'tts_failure_rate':
-                total = metrics_data['tts']['total']
-                failures = metrics_data['tts']['failure']
-                return (failures / total * 100) if total > 0 else 0
-
-            # User metrics
-            elif metric_name == 'failed_logins':
-                return metrics_data['users']['failed_logins']
-
-            # Security metrics (from log analyzer)
-            elif metric_name == 'brute_force_attempts':
-                analyzer = LogAnalyzer()
-                analysis = analyzer.analyze_security_logs(hours=1)
-                return len(analysis.get('brute_force_attempts', []))
-
+    def get_metric_value(
+        self,
+        metric_name: str,
+        metrics_data: Optional[Dict] = None
+    ) -> Optional[float]:
+        """
+        Get current value of a metric
+
+        Args:
+            metric_name: Name of the metric (key of METRIC_EXTRACTORS)
+            metrics_data: Snapshot from export_json(); fetched if omitted
+
+        Returns:
+            Metric value, or None if unknown or unavailable
+        """
+        extractor = METRIC_EXTRACTORS.get(metric_name)
+        if extractor is None:
             return None
+
+        try:
+            if metrics_data is None:
+                metrics_data = get_metrics_collector().export_json()
+            return extractor(metrics_data, self)
         except Exception as e:
             print(f"Error getting metric {metric_name}: {e}")
             return None
 
+    def get_security_analysis(self) -> Dict:
+        """
+        Get the last hour's security log analysis
+
+        The result is reused for SECURITY_ANALYSIS_TTL_SECONDS so rules
+        sharing it, or checks run in quick succession, parse the logs once.
+        """
+        now = time.monotonic()
+        cached_at, analysis = self._security_analysis
+        if analysis is None or now - cached_at > SECURITY_ANALYSIS_TTL_SECONDS:
+            analysis = self._log_analyzer.analyze_security_logs(hours=1)
+            self._security_analysis = (now, analysis)
+        return analysis
+
     def check_all_rules(self) -> List[Dict]:
         """Check all rules and return triggered alerts"""
         triggered_alerts = []
 
+        # Snapshot metrics once per cycle instead of once per rule
+        try:
+            metrics_data = get_metrics_collector().export_json()
+        except Exception as e:
+            print(f"Error exporting metrics: {e}")
+            return triggered_alerts
+        now = datetime.now()
+        timestamp = now.isoformat()
+
         for rule_name, rule in self.rules.items():
-            value = self.get_metric_value(rule.metric)
+            value = self.get_metric_value(rule.metric, metrics_data)
 
             if value is not None and rule.check(value):
                 alert = {
@@ -282,18 +407,15 @@ class AlertingSystem:
                     'operator': rule.operator,
                     'severity': rule.severity,
                     'description': rule.description,
-                    'timestamp': datetime.now().isoformat()
+                    'timestamp': timestamp
                 }
 
                 triggered_alerts.append(alert)
                 rule.trigger()
 
-                # Add to history
+                # Add to history (oldest alerts drop off automatically)
                 self.alert_history.append(alert)
-
-                # Keep only last 1000 alerts
-                if len(self.alert_history) > 1000:
-                    self.alert_history = self.alert_history[-1000:]
+                self._alert_times.append(now)
 
         return triggered_alerts
 
@@ -315,11 +437,13 @@ class AlertingSystem:
 
             msg.attach(MIMEText(html, 'html'))
 
-            # Send email
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
+            # Send email (the connection is shared by notification workers)
+            with self._smtp_lock:
+                try:
+                    self._get_smtp().send_message(msg)
+                except Exception:
+                    self._close_smtp()
+                    raise
 
             print(f"Alert email sent successfully to {self.alert_email}")
             return True
@@ -327,63 +451,49 @@ class AlertingSystem:
             print(f"Failed to send email alert: {e}")
             return False
 
+    def _get_smtp(self) -> smtplib.SMTP:
+        """Return an authenticated SMTP connection, reconnecting if it dropped"""
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except smtplib.SMTPException:
+                pass
+            self._close_smtp()
+
+        server = smtplib.SMTP(self.smtp_host, self.smtp_port)
+        try:
+            server.starttls()
+            server.login(self.smtp_user, self.smtp_password)
+        except Exception:
+            server.close()
+            raise
+        self._smtp = server
+        return server
+
+    def _close_smtp(self):
+        """Drop the cached SMTP connection"""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        self._smtp = None
+
     def _generate_alert_email_html(self, alerts: List[Dict]) -> str:
         """Generate HTML email content for alerts"""
-        severity_colors = {
-            'critical': '#dc3545',
-            'warning': '#ffc107',
-            'info': '#17a2b8'
-        }
-
-        html = '''
-<!DOCTYPE html>
-<html>
-<head>
-    <style>
-        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
-        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
-        .header { background: #667eea; color: white; padding: 20px; border-radius: 5px; }
-        .alert-box { margin: 15px 0; padding: 15px; border-left: 4px solid; border-radius: 5px; }
-        .critical { background: #fee; border-color: #dc3545; }
-        .warning { background: #fff4e5; border-color: #ffc107; }
-        .info { background: #e7f3ff; border-color: #17a2b8; }
-        .metric { font-weight: bold; font-size: 18px; }
-        .details { color: #666; font-size: 14px; margin-top: 5px; }
-        .footer { margin-top: 30px; padding-top: 20px; border-top: 1px solid #ddd; color: #666; font-size: 12px; }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h2>🚨 VoiceVerse Alert</h2>
-            <p>Detected ''' + str(len(alerts)) + ''' issue(s)</p>
-        </div>
-        '''
-
-        for alert in alerts:
-            severity_class = alert['severity']
-            html += f'''
-        <div class="alert-box {severity_class}">
-            <div class="metric">{alert['description']}</div>
-            <div class="details">
-                Current value: {alert['current_value']:.2f} {alert['operator']} {alert['threshold']}<br>
-                Severity: {alert['severity'].upper()}<br>
-                Time: {alert['timestamp']}
-            </div>
-        </div>
-            '''
-
-        html += '''
-        <div class="footer">
-            <p>This is an automated alert from VoiceVerse monitoring system.</p>
-            <p>Please review the metrics dashboard for more details.</p>
-        </div>
-    </div>
-</body>
-</html>
-        '''
-
-        return html
+        rows = [
+            _ALERT_ROW_TEMPLATE.format_map(
+                {**alert, 'severity_label': alert['severity'].upper()}
+            )
+            for alert in alerts
+        ]
+        return (
+            _EMAIL_HEAD.substitute(count=len(alerts))
+            + ''.join(rows)
+            + _EMAIL_TAIL
+        )
 
     def send_slack_alert(self, alerts: List[Dict]) -> bool:
         """Send Slack notification for alerts"""
@@ -391,23 +501,24 @@ class AlertingSystem:
             print("Slack webhook not configured, skipping Slack alert")
             return False
 
-        try:
-            import requests
+        if self._http is None:
+            print("requests not installed, skipping Slack alert")
+            return False
 
+        try:
             # Build message
-            text = f"🚨 *VoiceVerse Alert*\nDetected {len(alerts)} issue(s):\n\n"
-
+            lines = [f"🚨 *VoiceVerse Alert*\nDetected {len(alerts)} issue(s):\n"]
             for alert in alerts:
                 emoji = '🔴' if alert['severity'] == 'critical' else '⚠️'
-                text += f"{emoji} *{alert['description']}*\n"
-                text += f"   Current: {alert['current_value']:.2f} | Threshold: {alert['threshold']}\n\n"
+                lines.append(_SLACK_ROW_TEMPLATE.format_map({**alert, 'emoji': emoji}))
+            text = '\n'.join(lines)
 
             payload = {
                 'text': text,
                 'username': 'VoiceVerse Monitor'
             }
 
-            response = requests.post(self.slack_webhook, json=payload)
+            response = self._http.post(self.slack_webhook, json=payload, timeout=5)
 
             if response.status_code == 200:
                 print("Slack alert sent successfully")
@@ -419,32 +530,51 @@ class AlertingSystem:
             print(f"Failed to send Slack alert: {e}")
             return False
 
-    def send_notifications(self, alerts: List[Dict]):
-        """Send all configured notifications for alerts"""
+    def send_notifications(self, alerts: List[Dict], wait: bool = False):
+        """
+        Send all configured notifications for alerts
+
+        Email and Slack delivery are handed to a background pool so the
+        caller is not blocked on network I/O.
+
+        Args:
+            alerts: Triggered alerts
+            wait: Block until email and Slack delivery have finished
+        """
         if not alerts:
             return
 
         print(f"\n⚠️  Sending notifications for {len(alerts)} alert(s)...")
 
-        # Send email
-        self.send_email_alert(alerts)
-
-        # Send Slack
-        self.send_slack_alert(alerts)
+        # Send email and Slack in the background
+        futures = [
+            self._notify_pool.submit(self.send_email_alert, alerts),
+            self._notify_pool.submit(self.send_slack_alert, alerts)
+        ]
 
         # Log to console
         for alert in alerts:
             severity_icon = '🔴' if alert['severity'] == 'critical' else '⚠️'
             print(f"{severity_icon} {alert['description']} | Value: {alert['current_value']:.2f}")
 
+        if wait:
+            wait_futures(futures)
+
+    def close(self):
+        """Finish pending notifications, then close SMTP and HTTP connections"""
+        self._notify_pool.shutdown(wait=True)
+        with self._smtp_lock:
+            self._close_smtp()
+        if self._http is not None:
+            self._http.close()
+
     def get_alert_history(self, hours: int = 24) -> List[Dict]:
         """Get alert history for the last N hours"""
         cutoff = datetime.now() - timedelta(hours=hours)
 
-        return [
-            alert for alert in self.alert_history
-            if datetime.fromisoformat(alert['timestamp']) >= cutoff
-        ]
+        # History is appended in time order, so binary-search the cutoff
+        start = bisect_left(self._alert_times, cutoff)
+        return list(islice(self.alert_history, start, None))
 
     def save_rules_to_file(self, filename: Optional[str] = None):
         """Save current rules to JSON file"""
@@ -466,16 +596,21 @@ class AlertingSystem:
 
         os.makedirs(os.path.dirname(filename), exist_ok=True)
 
-        with open(filename, 'w') as f:
-            json.dump(rules_data, f, indent=2)
+        if orjson is not None:
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(rules_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(filename, 'w') as f:
+                json.dump(rules_data, f, indent=2)
 
         print(f"Alert rules saved to {filename}")
 
     def load_rules_from_file(self, filename: str):
         """Load rules from JSON file"""
         try:
-            with open(filename, 'r') as f:
-                rules_data = json.load(f)
+            with open(filename, 'rb') as f:
+                data = f.read()
+            rules_data = orjson.loads(data) if orjson is not None else json.loads(data)
 
             for rule_name, rule_config in rules_data.items():
                 self.add_rule(**rule_config)
@@ -528,6 +663,8 @@ def run_continuous_monitoring(check_interval_seconds: int = 300):
             print(f"Error in monitoring loop: {e}")
             time.sleep(check_interval_seconds)
 
+    alerts_system.close()
+
 
 def main():
     """CLI interface for alerting system"""
@@ -606,6 +743,8 @@ def main():
 
         print("=" * 60 + "\n")
 
+    alerts.close()
+
 
 if __name__ == '__main__':
     main()
@@ -21,12 +21,29 @@ Usage:
 import os
 import re
 import json
+import mmap
 import sqlite3
+from bisect import bisect_right
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from collections import defaultdict, Counter
 
+# Optional: Hyperscan matches all threat patterns in one SIMD pass
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+# Security log line: [timestamp] [level] EVENT - User: name, IP: addr[, Details: text]
+# Anchored and tolerant of surrounding blanks (including a trailing '\r\n'),
+# so lines are matched without strip(). Blanks never include '\n', which lets
+# the same pattern scan a whole file line by line in MULTILINE mode.
+SECURITY_LOG_PATTERN = (
+    r'^[^\S\n]*\[(.*?)\] \[(.*?)\] (.*?) - User: (.*?), IP: (.*?)'
+    r'(?:, Details: (.*?))?[^\S\n]*$'
+)
+
 
 class LogAnalyzer:
     """Analyzes application and security logs"""
@@ -44,9 +61,10 @@ class LogAnalyzer:
         self.db_path = db_path
 
         # Patterns for log parsing
-        self.security_pattern = re.compile(
-            r'\[(.*?)\] \[(.*?)\] (.*?) - User: (.*?), IP: (.*?)(?:, Details: (.*))?$'
-        )
+        self.security_pattern = re.compile(SECURITY_LOG_PATTERN)
+
+        # Same format, matched line by line over a whole (memory-mapped) log
+        self.security_log_pattern = re.compile(SECURITY_LOG_PATTERN.encode(), re.MULTILINE)
 
         # Threat indicators
         self.threat_patterns = [
@@ -60,17 +78,41 @@ class LogAnalyzer:
             r'eval\(',
         ]
 
+        # All threat patterns fused into one alternation (one regex pass per
+        # entry), plus each pattern on its own to attribute a hit
+        self._threat_regexes = [
+            re.compile(pattern, re.IGNORECASE) for pattern in self.threat_patterns
+        ]
+        self._threat_re = re.compile(
+            '|'.join(f'(?P<p{i}>{pattern})' for i, pattern in enumerate(self.threat_patterns)),
+            re.IGNORECASE
+        )
+        self._threat_db = self._compile_threat_db()
+
         # Known attack IP patterns (simple examples)
         self.known_bad_ips = set()
 
+        # Parsed log entries per path, tagged with the file's (mtime, size)
+        self._entry_cache: Dict[str, Tuple[Tuple[int, int], List[Dict]]] = {}
+
     def parse_security_log_line(self, line: str) -> Optional[Dict]:
         """Parse a single security log line"""
-        match = self.security_pattern.match(line.strip())
+        match = self.security_pattern.match(line)
         if not match:
             return None
 
-        timestamp_str, level, event_type, username, ip, details = match.groups()
+        return self._make_entry(*match.groups())
 
+    def _make_entry(
+        self,
+        timestamp_str: str,
+        level: str,
+        event_type: str,
+        username: str,
+        ip: str,
+        details: Optional[str]
+    ) -> Optional[Dict]:
+        """Build a log entry from parsed fields (None if the timestamp is bad)"""
         try:
             timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
         except ValueError:
@@ -86,26 +128,127 @@ class LogAnalyzer:
         }
 
     def read_log_file(self, log_path: str, hours: Optional[int] = None) -> List[Dict]:
-        """Read and parse log file"""
-        if not os.path.exists(log_path):
+        """
+        Read and parse log file
+
+        Parsed entries are cached until the file's mtime or size changes, so
+        the analyses in generate_report() share a single scan of the log.
+        The returned entries are shared and must be treated as read-only.
+        """
+        try:
+            stat = os.stat(log_path)
+        except OSError:
             return []
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        cached = self._entry_cache.get(log_path)
+        if cached is not None and cached[0] == signature:
+            entries = cached[1]
+        else:
+            try:
+                signature, entries = self._scan_log_file(log_path)
+            except Exception as e:
+                print(f"Error reading log file {log_path}: {e}")
+                return []
+            self._entry_cache[log_path] = (signature, entries)
+
+        if not hours:
+            return entries
+
+        cutoff_time = datetime.now() - timedelta(hours=hours)
+        return [entry for entry in entries if entry['timestamp'] >= cutoff_time]
+
+    def _scan_log_file(self, log_path: str) -> Tuple[Tuple[int, int], List[Dict]]:
+        """
+        Parse every entry in a log file
 
-        cutoff_time = None
-        if hours:
-            cutoff_time = datetime.now() - timedelta(hours=hours)
+        The file is memory-mapped and matched in one finditer() pass, so no
+        per-line Python strings are created; only matched fields are decoded.
 
+        Returns:
+            ((mtime_ns, size) of the scanned file, parsed entries)
+        """
         entries = []
-        try:
-            with open(log_path, 'r') as f:
-                for line in f:
-                    entry = self.parse_security_log_line(line)
-                    if entry:
-                        if cutoff_time is None or entry['timestamp'] >= cutoff_time:
+        with open(log_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_size:
+                with mmap.mmap(f.fileno(), stat.st_size, access=mmap.ACCESS_READ) as mm:
+                    if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                    for match in self.security_log_pattern.finditer(mm):
+                        entry = self._make_entry(*(
+                            field.decode('utf-8', 'replace') if field is not None else None
+                            for field in match.groups()
+                        ))
+                        if entry:
                             entries.append(entry)
+
+        return (stat.st_mtime_ns, stat.st_size), entries
+
+    def _compile_threat_db(self):
+        """Compile threat_patterns into a Hyperscan database (None if unavailable)"""
+        if hyperscan is None:
+            return None
+
+        try:
+            db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+            db.compile(
+                expressions=[pattern.encode() for pattern in self.threat_patterns],
+                ids=list(range(len(self.threat_patterns))),
+                elements=len(self.threat_patterns),
+                flags=[hyperscan.HS_FLAG_CASELESS] * len(self.threat_patterns)
+            )
         except Exception as e:
-            print(f"Error reading log file {log_path}: {e}")
+            print(f"Hyperscan unavailable for threat patterns, using re: {e}")
+            return None
+        return db
+
+    def _find_threat_patterns(self, details_list: List[str]) -> List[Optional[str]]:
+        """
+        Find the first threat pattern (in list order) in each details string
+
+        With Hyperscan, all strings are scanned in one pass as newline-joined
+        lines ('.' never crosses a newline). Otherwise each string is searched
+        with the combined regex.
+        """
+        if self._threat_db is None or not details_list:
+            return [self._match_threat_pattern(details) for details in details_list]
+
+        encoded = [details.encode('utf-8') for details in details_list]
+        starts = []
+        offset = 0
+        for data in encoded:
+            starts.append(offset)
+            offset += len(data) + 1
+
+        first_ids: List[Optional[int]] = [None] * len(encoded)
+
+        def on_match(pattern_id, start, end, flags, context):
+            line = bisect_right(starts, end - 1) - 1
+            current = first_ids[line]
+            if current is None or pattern_id < current:
+                first_ids[line] = pattern_id
+
+        self._threat_db.scan(b'\n'.join(encoded), match_event_handler=on_match)
+
+        return [
+            self.threat_patterns[pattern_id] if pattern_id is not None else None
+            for pattern_id in first_ids
+        ]
+
+    def _match_threat_pattern(self, details: str) -> Optional[str]:
+        """Return the first threat pattern (in list order) found in details"""
+        match = self._threat_re.search(details)
+        if match is None:
+            return None
 
-        return entries
+        # The alternation reports the leftmost hit; an earlier pattern in the
+        # list may also match further along, and it takes precedence
+        index = int(match.lastgroup[1:])
+        for i in range(index):
+            if self._threat_regexes[i].search(details):
+                return self.threat_patterns[i]
+        return self.threat_patterns[index]
 
     def analyze_security_logs(self, hours: int = 24) -> Dict:
         """Analyze security logs for threats and patterns"""
@@ -149,19 +292,20 @@ class LogAnalyzer:
 
         # Detect threats based on patterns
         threats = []
-        for entry in entries:
+        threat_matches = self._find_threat_patterns(
+            [entry.get('details', '') for entry in entries]
+        )
+        for entry, pattern in zip(entries, threat_matches):
             details = entry.get('details', '')
-            for pattern in self.threat_patterns:
-                if re.search(pattern, details, re.IGNORECASE):
-                    threats.append({
-                        'timestamp': entry['timestamp'],
-                        'ip': entry['ip'],
-                        'username': entry['username'],
-                        'event_type': entry['event_type'],
-                        'threat_pattern': pattern,
-                        'details': details
-                    })
-                    break
+            if pattern is not None:
+                threats.append({
+                    'timestamp': entry['timestamp'],
+                    'ip': entry['ip'],
+                    'username': entry['username'],
+                    'event_type': entry['event_type'],
+                    'threat_pattern': pattern,
+                    'details': details
+                })
 
         # Find suspicious IPs (multiple different attack types)
         ip_events = defaultdict(set)
@@ -10,7 +10,7 @@ import os
 import json
 
 # Import Phase 4 features
-from features import BatchProcessor, AudioEnhancer, UserAnalytics, CostEstimator
+from features import BatchProcessor, AudioEnhancer, UserAnalytics, CostEstimator, get_analytics_db
 
 
 def login_required_phase4(f):
@@ -32,8 +32,9 @@ def init_phase4_routes(app):
     # Initialize Phase 4 components
     batch_processor = BatchProcessor()
     audio_enhancer = AudioEnhancer()
-    user_analytics = UserAnalytics()
-    cost_estimator = CostEstimator()
+    analytics_db = get_analytics_db()
+    user_analytics = UserAnalytics(analytics_db)
+    cost_estimator = CostEstimator(analytics_db)
 
     # ========== BATCH PROCESSING ROUTES ==========
 
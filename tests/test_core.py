@@ -60,5 +60,115 @@ def test_api_key_generation():
     assert len(key) > 30
 
 
+def test_ip_hash_salt_read_after_import(monkeypatch):
+    """Test that IP_HASH_SALT set after importing logger (e.g. by load_dotenv) is used"""
+    from logger import SecurityLogger
+
+    monkeypatch.setenv('IP_HASH_SALT', 'first-salt')
+    first = SecurityLogger(None)._hash_ip('203.0.113.7')
+
+    monkeypatch.setenv('IP_HASH_SALT', 'second-salt')
+    second = SecurityLogger(None)._hash_ip('203.0.113.7')
+
+    assert first != second
+    assert len(first) == len(second) == 16
+
+
+def test_db_writer_stops_at_sentinel_and_keeps_later_events():
+    """Test that an event queued behind the writer's stop sentinel is not lost"""
+    import logger
+
+    class FakeDB:
+        def __init__(self):
+            self.events = []
+
+        def log_security_event(self, **event):
+            self.events.append(event)
+
+    logger._stop_db_writer()
+    db = FakeDB()
+    event = {'event_type': 'TEST', 'user_id': None, 'ip_address': 'unknown',
+             'details': None, 'success': True}
+
+    # A log_event racing with _stop_db_writer() lands after the sentinel
+    logger._db_log_queue.put(None)
+    logger._db_log_queue.put((db, event))
+    logger._db_writer()
+    assert db.events == []
+
+    # The next writer picks the event up
+    logger._start_db_writer()
+    logger._stop_db_writer()
+    assert db.events == [event]
+
+
+def _make_analytics(tmp_path):
+    """Create a UserAnalytics over a minimal schema with one user and three generations"""
+    import sqlite3
+    from features.analytics import UserAnalytics
+
+    db_path = str(tmp_path / 'analytics.db')
+    conn = sqlite3.connect(db_path)
+    conn.executescript('''
+        CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT, created_at TIMESTAMP);
+        CREATE TABLE tts_history (
+            id INTEGER PRIMARY KEY, user_id INTEGER, text TEXT, voice TEXT,
+            model TEXT, character_count INTEGER, created_at TIMESTAMP
+        );
+        CREATE TABLE saved_audio (id INTEGER PRIMARY KEY, user_id INTEGER);
+        INSERT INTO users (id, username, created_at) VALUES (1, 'tester', '2024-01-01 00:00:00');
+    ''')
+    conn.commit()
+    conn.close()
+
+    analytics = UserAnalytics(db_path)
+    for voice in ('alloy', 'alloy', 'echo'):
+        analytics.record_generation(1, 'hello world', voice, 'tts-1')
+    return analytics
+
+
+def _fresh_user_stats(analytics, user_id):
+    """Compute get_user_stats() from the tables, bypassing the materialized blob"""
+    with analytics.db.cursor() as cursor:
+        cursor.execute('DELETE FROM user_stats_cache WHERE user_id = ?', (user_id,))
+    return analytics.get_user_stats(user_id)
+
+
+def test_record_generation_matches_fresh_stats(tmp_path):
+    """Test that the delta-updated stats blob equals a fresh computation"""
+    analytics = _make_analytics(tmp_path)
+    try:
+        analytics.get_user_stats(1)  # Materialize the blob
+
+        analytics.record_generation(1, 'Converted Report.PDF', 'echo', 'tts-1-hd')
+        analytics.record_generation(1, 'meeting NOTES.docx', 'echo', 'tts-1-hd')
+
+        cached = analytics.get_user_stats(1)
+        fresh = _fresh_user_stats(analytics, 1)
+
+        assert cached == fresh
+        # Usage breakdowns keep the SQL order (count, highest first)
+        assert list(cached['voice_usage'].items()) == [('echo', 3), ('alloy', 2)]
+        assert list(cached['model_usage'].items()) == list(fresh['model_usage'].items())
+        assert cached['document_processing'] == {'pdf_files': 1, 'docx_files': 1}
+    finally:
+        analytics.db.close()
+
+
+def test_saved_audio_write_invalidates_stats(tmp_path):
+    """Test that saving audio drops the user's materialized stats"""
+    analytics = _make_analytics(tmp_path)
+    try:
+        assert analytics.get_user_stats(1)['saved_audio_count'] == 0
+
+        with analytics.db.cursor() as cursor:
+            cursor.execute('INSERT INTO saved_audio (user_id) VALUES (1)')
+
+        assert analytics.get_user_stats(1)['saved_audio_count'] == 1
+        assert analytics.get_user_stats(1) == _fresh_user_stats(analytics, 1)
+    finally:
+        analytics.db.close()
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
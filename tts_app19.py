@@ -212,7 +212,9 @@ VALID_VOICES = {'alloy', 'echo', 'fable', 'onyx', 'nova', 'shimmer'}
 
 # Security: Set up security audit logging
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+import atexit
+import queue
 
 # Create logs directory if it doesn't exist
 if not os.path.exists('logs'):
@@ -237,6 +239,24 @@ security_formatter = logging.Formatter(
 security_handler.setFormatter(security_formatter)
 security_logger.addHandler(security_handler)
 
+# Request-path diagnostics: the request thread only enqueues records,
+# a listener thread does the actual console I/O.
+# Per-request DEBUG lines are only emitted when TTS_DEBUG=true.
+TTS_DEBUG = os.getenv('TTS_DEBUG', 'False').lower() == 'true'
+app_log_queue = queue.Queue(-1)
+app_logger = logging.getLogger('voiceverse.app')
+app_logger.setLevel(logging.DEBUG if TTS_DEBUG else logging.INFO)
+app_logger.addHandler(QueueHandler(app_log_queue))
+app_logger.propagate = False
+app_console_handler = logging.StreamHandler(sys.stdout)
+app_console_handler.setFormatter(logging.Formatter(
+    '%(asctime)s %(levelname)s %(name)s: %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+))
+app_log_listener = QueueListener(app_log_queue, app_console_handler)
+app_log_listener.start()
+atexit.register(app_log_listener.stop)
+
 def log_security_event(event_type, details, username=None, ip_address=None, success=True):
     """
     Security: Log security-relevant events using SecurityLogger
@@ -2243,40 +2263,39 @@ def clear_history_endpoint():
 def add_to_history_endpoint():
     try:
         data = request.get_json()
-        print(f"DEBUG /api/add-to-history: Received data: {data}")
+        app_logger.debug("/api/add-to-history: Received data: %s", data)
 
         filename = data.get('filename') if data else None
 
         if not filename:
-            print(f"ERROR /api/add-to-history: Missing filename in request data: {data}")
+            app_logger.error("/api/add-to-history: Missing filename in request data: %s", data)
             return jsonify({'success': False, 'error': 'Missing filename'}), 400
 
         # Get user ID
         username = session.get('username')
-        print(f"DEBUG /api/add-to-history: Username from session: {username}")
+        app_logger.debug("/api/add-to-history: Username from session: %s", username)
 
         user = db.get_user(username)
         if not user:
-            print(f"ERROR /api/add-to-history: User not found for username: {username}")
+            app_logger.error("/api/add-to-history: User not found for username: %s", username)
             return jsonify({'success': False, 'error': 'Unauthorized'}), 403
 
         # Get file info
         file_info = db.get_audio_file(filename)
         if not file_info:
-            print(f"ERROR /api/add-to-history: File not found: {filename}")
+            app_logger.error("/api/add-to-history: File not found: %s", filename)
             return jsonify({'success': False, 'error': 'File not found'}), 404
 
-        print(f"DEBUG /api/add-to-history: Recording playback - User ID: {user['id']}, File ID: {file_info['id']}")
+        app_logger.debug("/api/add-to-history: Recording playback - User ID: %s, File ID: %s",
+                         user['id'], file_info['id'])
 
         # Record playback
         db.record_playback(user['id'], file_info['id'])
 
-        print(f"SUCCESS /api/add-to-history: Recorded playback for {filename}")
+        app_logger.info("/api/add-to-history: Recorded playback for %s", filename)
         return jsonify({'success': True})
     except Exception as e:
-        print(f"ERROR /api/add-to-history: Exception: {e}")
-        import traceback
-        traceback.print_exc()
+        app_logger.exception("/api/add-to-history: Exception: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/bulk-delete', methods=['POST'])